@@ -423,7 +423,7 @@ class ExcThread(threading.Thread):
         Set data members.
 
         Init function with a bucket that can be used to communicate exceptions to the caller.
-        The bucket is a Queue.queue() or queue.Queue() object that can hold an exception thrown by a thread.
+        The bucket is a queue.Queue() or queue.SimpleQueue() object that can hold an exception thrown by a thread.
 
         :param bucket: queue based bucket (Any)
         :param target: target function to execute (Callable)
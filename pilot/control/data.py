@@ -30,6 +30,7 @@ import time
 import queue
 from typing import Any
 from pathlib import Path
+from shutil import which
 
 from pilot.api.data import (
     StageInClient,
@@ -47,7 +48,8 @@ from pilot.common.exception import (
 )
 from pilot.util.auxiliary import (
     set_pilot_state,
-    check_for_final_server_update
+    check_for_final_server_update,
+    set_server_update
 )
 from pilot.util.common import should_abort
 from pilot.util.config import config
@@ -99,8 +101,9 @@ def control(queues: Any, traces: Any, args: Any):
     :param args: Pilot arguments (e.g. containing queue name, queuedata dictionary, etc) (Any).
     """
     targets = {'copytool_in': copytool_in, 'copytool_out': copytool_out, 'queue_monitoring': queue_monitoring}
-    threads = [ExcThread(bucket=queue.Queue(), target=target, kwargs={'queues': queues, 'traces': traces, 'args': args},
-                         name=name) for name, target in list(targets.items())]  # Python 2/3
+    # the exception buckets are plain FIFOs (put/get only), so the lock-free SimpleQueue is sufficient
+    threads = [ExcThread(bucket=queue.SimpleQueue(), target=target, kwargs={'queues': queues, 'traces': traces, 'args': args},
+                         name=name) for name, target in targets.items()]
 
     [thread.start() for thread in threads]
 
@@ -120,10 +123,8 @@ def control(queues: Any, traces: Any, args: Any):
                     # deal with the exception
                     # ..
 
-                thread.join(0.1)
-                time.sleep(0.1)
-
-            time.sleep(0.5)
+            # wake up immediately when graceful_stop is set instead of sleeping through fixed intervals
+            args.graceful_stop.wait(1)
     except Exception as exc:
         logger.warning(f"exception caught while handling threads: {exc}")
     finally:
@@ -428,7 +429,6 @@ def copytool_in(queues: Any, traces: Any, args: Any):  # noqa: C901
     """
     abort = False
     while not args.graceful_stop.is_set() and not abort:
-        time.sleep(0.5)
         try:
             # abort if kill signal arrived too long time ago, ie loop is stuck
             current_time = int(time.time())
@@ -436,12 +436,12 @@ def copytool_in(queues: Any, traces: Any, args: Any):  # noqa: C901
                 logger.warning('loop has run for too long time after first kill signal - will abort')
                 break
 
-            # extract a job to stage-in its input
+            # extract a job to stage-in its input (the blocking get is the only wait in this loop)
             job = queues.data_in.get(block=True, timeout=1)
 
             # does the user want to execute any special commands before stage-in?
             pilot_user = os.environ.get('PILOT_USER', 'generic').lower()
-            user = __import__(f'pilot.user.{pilot_user}.common', globals(), locals(), [pilot_user], 0)  # Python 2/3
+            user = __import__(f'pilot.user.{pilot_user}.common', globals(), locals(), [pilot_user], 0)
             cmd = user.get_utility_commands(job=job, order=UTILITY_BEFORE_STAGEIN)
             if cmd:
                 _, stdout, stderr = execute(cmd.get('command'))
@@ -468,7 +468,7 @@ def copytool_in(queues: Any, traces: Any, args: Any):  # noqa: C901
                 put_in_queue(job, queues.data_out)
                 break
 
-            os.environ['SERVER_UPDATE'] = SERVER_UPDATE_RUNNING
+            set_server_update(SERVER_UPDATE_RUNNING)
 
             if args.abort_job.is_set():
                 traces.pilot['command'] = 'abort'
@@ -580,15 +580,14 @@ def copytool_out(queues: Any, traces: Any, args: Any):  # noqa: C901
     processed_jobs = []
     while cont:
 
-        time.sleep(0.5)
-
         # abort if kill signal arrived too long time ago, ie loop is stuck
         current_time = int(time.time())
         if args.kill_time and current_time - args.kill_time > MAX_KILL_WAIT_TIME:
             logger.warning('loop has run for too long time after first kill signal - will abort')
             break
 
-        # check for abort, print useful messages and include a 1 s sleep
+        # check for abort, print useful messages and include a 1 s sleep (together with the blocking get below,
+        # this is the only wait in the loop)
         abort = should_abort(args, label='data:copytool_out')
         try:
             job = queues.data_out.get(block=True, timeout=1)
@@ -699,7 +698,7 @@ def get_input_file_dictionary(indata: list) -> dict:
 
 
 def create_log(workdir: str, logfile_name: str, tarball_name: str, cleanup: bool, input_files: list = [],
-               output_files: list = [], piloterrors: list = [], debugmode: bool = False):
+               output_files: list = [], piloterrors: list = [], debugmode: bool = False, corecount: int = 1):
     """
     Create the tarball for the job.
 
@@ -711,6 +710,7 @@ def create_log(workdir: str, logfile_name: str, tarball_name: str, cleanup: bool
     :param output_files: list of output files to remove (list)
     :param piloterrors: list of Pilot assigned error codes (list)
     :param debugmode: True if debug mode has been switched on (bool)
+    :param corecount: number of cores of the job slot, used for the compression (int)
     :raises LogFileCreationFailure: in case of log file creation problem.
     """
     logger.debug(f'preparing to create log file (debug mode={debugmode})')
@@ -730,13 +730,17 @@ def create_log(workdir: str, logfile_name: str, tarball_name: str, cleanup: bool
     # perform special cleanup (user specific) prior to log file creation
     if cleanup:
         pilot_user = os.environ.get('PILOT_USER', 'generic').lower()
-        user = __import__(f'pilot.user.{pilot_user}.common', globals(), locals(), [pilot_user], 0)  # Python 2/3
+        user = __import__(f'pilot.user.{pilot_user}.common', globals(), locals(), [pilot_user], 0)
         user.remove_redundant_files(workdir, piloterrors=piloterrors, debugmode=debugmode)
 
     # remove any present input/output files before tarring up workdir
-    for fname in input_files + output_files:
-        path = os.path.join(workdir, fname)
-        if os.path.exists(path):
+    # (a single pass over the directory instead of one existence check per file name)
+    exclude = set(input_files)
+    exclude.update(output_files)
+    if exclude:
+        with os.scandir(workdir) as entries:
+            paths = [entry.path for entry in entries if entry.name in exclude]
+        for path in paths:
             logger.info(f'removing file: {path}')
             remove(path)
 
@@ -759,7 +763,7 @@ def create_log(workdir: str, logfile_name: str, tarball_name: str, cleanup: bool
 
     try:
         # add e.g. sleep 200; before tar command to test time-out
-        cmd = f"pwd;tar cvfz {fullpath} {tarball_name} --dereference --one-file-system; echo $?"
+        cmd = f"pwd;tar {get_tar_compression_option(corecount)} -cvf {fullpath} {tarball_name} --dereference --one-file-system; echo $?"
         exit_code, stdout, stderr = execute(cmd, timeout=timeout)
     except Exception as error:
         raise LogFileCreationFailure(error)
@@ -842,6 +846,25 @@ def get_tar_timeout(dirsize: float) -> int:
     return min(timeout, timeout_max)
 
 
+def get_tar_compression_option(corecount: int = 1) -> str:
+    """
+    Return the tar option to use for compressing the log tarball.
+
+    Parallel gzip (pigz) is used if available and the job slot has more than one core, since gzip compression of a
+    large work directory is otherwise limited to a single core. pigz is restricted to the cores of the job slot, so
+    that it does not use cores outside the slot on a shared worker node. The result is an ordinary gzip file in both
+    cases.
+
+    :param corecount: number of cores of the job slot (int)
+    :return: tar compression option (str).
+    """
+    corecount = corecount or 1
+    if corecount > 1 and which('pigz'):
+        return f'--use-compress-program="pigz -p {corecount}"'
+
+    return '-z'
+
+
 def _do_stageout(job: Any, args: Any, xdata: list, activity: list, title: str, ipv: str = 'IPv6') -> bool:
     """
     Use the `StageOutClient` in the Data API to perform stage-out.
@@ -980,7 +1003,7 @@ def _stage_out_new(job: Any, args: Any) -> bool:
             create_log(job.workdir, logfile.lfn, tarball_name, args.cleanup,
                        input_files=[fspec.lfn for fspec in job.indata],
                        output_files=[fspec.lfn for fspec in job.outdata],
-                       piloterrors=job.piloterrorcodes, debugmode=job.debug)
+                       piloterrors=job.piloterrorcodes, debugmode=job.debug, corecount=job.corecount)
         except LogFileCreationFailure as error:
             logger.warning(f'failed to create tar file: {error}')
             set_pilot_state(job=job, state="failed")
@@ -1042,17 +1065,78 @@ def generate_fileinfo(job: Any) -> dict:
     :return: file info (dict).
     """
     fileinfo = {}
-    checksum_type = config.File.checksum_type if config.File.checksum_type == 'adler32' else 'md5sum'
+    checksum_type = config.File.checksum_type
+    checksum_key = checksum_type if checksum_type == 'adler32' else 'md5sum'
     for iofile in job.outdata + job.logdata:
-        if iofile.status in ['transferred']:
+        if iofile.status == 'transferred':
             fileinfo[iofile.lfn] = {'guid': iofile.guid,
                                     'fsize': iofile.filesize,
-                                    f'{checksum_type}': iofile.checksum.get(config.File.checksum_type),
+                                    checksum_key: iofile.checksum.get(checksum_type),
                                     'surl': iofile.turl}
 
     return fileinfo
 
 
+def handle_finished_data_out(job: Any, queues: Any):
+    """
+    Move a job from the finished_data_out queue to the finished_jobs or failed_jobs queue.
+
+    :param job: job object (Any)
+    :param queues: internal queues for job handling (Any).
+    """
+    # use the payload/transform exitCode from the job report if it exists
+    if job.transexitcode == 0 and job.exitcode == 0 and job.piloterrorcodes == []:
+        logger.info('finished stage-out for finished payload, adding job to finished_jobs queue')
+        #queues.finished_jobs.put(job)
+        put_in_queue(job, queues.finished_jobs)
+    else:
+        logger.info('finished stage-out (of log) for failed payload')
+        #queues.failed_jobs.put(job)
+        put_in_queue(job, queues.failed_jobs)
+
+
+def handle_failed_data_out(job: Any, queues: Any, args: Any):
+    """
+    Attempt to stage-out the log of a job from the failed_data_out queue and move it to the failed_jobs queue.
+
+    :param job: job object (Any)
+    :param queues: internal queues for job handling (Any)
+    :param args: Pilot arguments (e.g. containing queue name, queuedata dictionary, etc) (Any).
+    """
+    # attempt to upload the log in case the previous stage-out failure was not an SE error
+    job.stageout = "log"
+    set_pilot_state(job=job, state="failed")
+    if not _stage_out_new(job, args):
+        logger.info("job %s failed during stage-out", job.jobid)
+
+    put_in_queue(job, queues.failed_jobs)
+
+
+def drain_data_out_queues(queues: Any, args: Any, timeout: int = 1):
+    """
+    Handle the jobs that are left in (or arrive within the time-out in) the finished_data_out and failed_data_out queues.
+
+    Called once by queue_monitoring() before it finishes.
+
+    :param queues: internal queues for job handling (Any)
+    :param args: Pilot arguments (e.g. containing queue name, queuedata dictionary, etc) (Any)
+    :param timeout: time to wait for a job in each queue in seconds (int).
+    """
+    while True:
+        try:
+            job = queues.finished_data_out.get(timeout=timeout)
+        except queue.Empty:
+            break
+        handle_finished_data_out(job, queues)
+
+    while True:
+        try:
+            job = queues.failed_data_out.get(timeout=timeout)
+        except queue.Empty:
+            break
+        handle_failed_data_out(job, queues, args)
+
+
 def queue_monitoring(queues: Any, traces: Any, args: Any):
     """
     Monitor data queues.
@@ -1064,18 +1148,19 @@ def queue_monitoring(queues: Any, traces: Any, args: Any):
     :param args: Pilot arguments (e.g. containing queue name, queuedata dictionary, etc) (Any)
     """
     while True:  # will abort when graceful_stop has been set
-        time.sleep(0.5)
         if traces.pilot['command'] == 'abort':
             logger.warning('data queue monitor saw the abort instruction')
             args.graceful_stop.set()
 
         # abort in case graceful_stop has been set, and less than 30 s has passed since MAXTIME was reached (if set)
         # (abort at the end of the loop)
+        # note: should_abort() waits up to 1 s on graceful_stop - this is the only wait in the loop while graceful_stop
+        # is not set, the queues below are checked without blocking
         abort = should_abort(args, label='data:queue_monitoring')
 
         # monitor the failed_data_in queue
         try:
-            job = queues.failed_data_in.get(block=True, timeout=1)
+            job = queues.failed_data_in.get(block=False)
         except queue.Empty:
             pass
         else:
@@ -1090,37 +1175,29 @@ def queue_monitoring(queues: Any, traces: Any, args: Any):
 
         # monitor the finished_data_out queue
         try:
-            job = queues.finished_data_out.get(block=True, timeout=1)
+            job = queues.finished_data_out.get(block=False)
         except queue.Empty:
             pass
         else:
-            # use the payload/transform exitCode from the job report if it exists
-            if job.transexitcode == 0 and job.exitcode == 0 and job.piloterrorcodes == []:
-                logger.info('finished stage-out for finished payload, adding job to finished_jobs queue')
-                #queues.finished_jobs.put(job)
-                put_in_queue(job, queues.finished_jobs)
-            else:
-                logger.info('finished stage-out (of log) for failed payload')
-                #queues.failed_jobs.put(job)
-                put_in_queue(job, queues.failed_jobs)
+            handle_finished_data_out(job, queues)
 
         # monitor the failed_data_out queue
         try:
-            job = queues.failed_data_out.get(block=True, timeout=1)
+            job = queues.failed_data_out.get(block=False)
         except queue.Empty:
             pass
         else:
-            # attempt to upload the log in case the previous stage-out failure was not an SE error
-            job.stageout = "log"
-            set_pilot_state(job=job, state="failed")
-            if not _stage_out_new(job, args):
-                logger.info("job %s failed during stage-out", job.jobid)
-
-            put_in_queue(job, queues.failed_jobs)
+            handle_failed_data_out(job, queues, args)
 
         if abort:
+            # jobs may still be moved to the stage-out queues while shutting down, take care of those before leaving
+            drain_data_out_queues(queues, args)
             break
 
+        # should_abort() returns at once when graceful_stop has been set, so wait here while continuing for now
+        if args.graceful_stop.is_set():
+            time.sleep(1)
+
     # proceed to set the job_aborted flag?
     if threads_aborted(caller='queue_monitoring'):
         logger.debug('will proceed to set job_aborted')
@@ -57,6 +57,7 @@ from pilot.util.auxiliary import (
     set_pilot_state,
     get_pilot_state,
     check_for_final_server_update,
+    set_server_update,
     pilot_version_banner,
     is_virtual_machine,
     has_instruction_sets,
@@ -360,7 +361,7 @@ def is_final_update(job: Any, state: str, tag: str = 'sending') -> bool:
     """
     if state in {'finished', 'failed', 'holding'}:
         final = True
-        os.environ['SERVER_UPDATE'] = SERVER_UPDATE_UPDATING
+        set_server_update(SERVER_UPDATE_UPDATING)
         logger.info(f'job {job.jobid} has {state} - {tag} final server update')
 
         # make sure that job.state is 'failed' if there's a set error code
@@ -446,7 +447,7 @@ def send_state(job: Any, args: Any, state: str, xml: str = "", metadata: str = "
         handle_backchannel_command(res, job, args, test_tobekilled=test_tobekilled)
 
         if final and os.path.exists(job.workdir):  # ignore if workdir doesn't exist - might be a delayed jobUpdate
-            os.environ['SERVER_UPDATE'] = SERVER_UPDATE_FINAL
+            set_server_update(SERVER_UPDATE_FINAL)
 
         if state in {'finished', 'holding', 'failed'}:
             logger.info(f'setting job as completed (state={state})')
@@ -455,7 +456,7 @@ def send_state(job: Any, args: Any, state: str, xml: str = "", metadata: str = "
         return True
 
     if final:
-        os.environ['SERVER_UPDATE'] = SERVER_UPDATE_TROUBLE
+        set_server_update(SERVER_UPDATE_TROUBLE)
 
     return False
 
@@ -1596,7 +1597,7 @@ def proceed_with_getjob(timefloor: int, starttime: int, jobnumber: int, getjob_r
         logger.info('still updating previous job, will not ask for a new job yet')
         return False
 
-    os.environ['SERVER_UPDATE'] = SERVER_UPDATE_NOT_DONE
+    set_server_update(SERVER_UPDATE_NOT_DONE)
     return True
 
 
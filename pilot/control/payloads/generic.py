@@ -53,7 +53,10 @@ from pilot.util.filehandling import (
     write_file,
     read_file
 )
-from pilot.util.processes import kill_processes
+from pilot.util.processes import (
+    kill_processes,
+    wait_for_process
+)
 from pilot.util.timing import (
     add_to_pilot_timing,
     get_time_measurement
@@ -579,37 +582,26 @@ class Executor():
         :param proc: subprocess object (Any)
         :return: exit code (int).
         """
-        breaker = False
         exit_code = None
         iteration = 0
         while True:
             time.sleep(0.1)
 
             iteration += 1
-            for _ in range(60):
-                if args.graceful_stop.is_set():
-                    breaker = True
-                    logger.info(f'breaking -- sending SIGTERM to pid={proc.pid}')
-                    os.killpg(os.getpgid(proc.pid), signal.SIGTERM)
-                    break
-                exit_code = proc.poll()
-                if exit_code is not None:
-                    break
-                time.sleep(1)
-            if breaker:
-                logger.info(f'breaking -- sleep 10 s before sending SIGKILL pid={proc.pid}')
-                time.sleep(10)
-                proc.kill()
+            # returns as soon as the process exits or graceful_stop has been set (checked every second), or after 60 s
+            exit_code = wait_for_process(proc, 60, stop_event=args.graceful_stop)
+            if exit_code is None and args.graceful_stop.is_set():
+                logger.info(f'breaking -- sending SIGTERM to pid={proc.pid}')
+                os.killpg(os.getpgid(proc.pid), signal.SIGTERM)
+                logger.info(f'breaking -- wait up to 10 s before sending SIGKILL pid={proc.pid}')
+                if wait_for_process(proc, 10) is None:
+                    proc.kill()
                 break
 
-            exit_code = proc.poll()
-
             if iteration % 10 == 0:
                 logger.info(f'running: iteration={iteration} pid={proc.pid} exit_code={exit_code}')
             if exit_code is not None:
                 break
-            else:
-                continue
 
         return exit_code
 
@@ -37,6 +37,9 @@ from pilot.util.filehandling import (
 
 logger = logging.getLogger(__name__)
 
+# used when scanning transfer command output for the real error message
+details_pattern = re.compile(r"[Dd]etails\s*:\s*(?P<error>.*)")
+
 
 def get_timeout(filesize: int, add: int = 0) -> int:
     """
@@ -142,10 +145,8 @@ def get_copysetup(copytools: list, copytool_name: str) -> str:
     if not copytools:
         return ""
 
-    for ct in list(copytools.keys()):  # Python 2/3
-        if copytool_name == ct:
-            copysetup = copytools[ct].get('setup')
-            break
+    if copytool_name in copytools:
+        copysetup = copytools[copytool_name].get('setup')
 
     return copysetup
 
@@ -174,8 +175,12 @@ def output_line_scan(ret: dict, output: str) -> dict:
     :param output: transfer command stdout (str)
     :return: updated error info dictionary (dict).
     """
-    for line in output.split('\n'):
-        match = re.search(r"[Dd]etails\s*:\s*(?P<error>.*)", line)  # Python 3 (added r)
+    # avoid splitting the (possibly large) output into lines when none of the searched strings are present
+    if 'etails' not in output and 'service_unavailable' not in output:
+        return ret
+
+    for line in output.splitlines():
+        match = details_pattern.search(line)
         if match:
             ret['error'] = match.group('error')
         elif 'service_unavailable' in line:
@@ -170,7 +170,7 @@ def copy_out(files: list, **kwargs: dict) -> list:
         cmd = ['gfal-copy --verbose -f', f' -t {timeout}']
 
         if fspec.checksum:
-            cmd += ['-K', '%s:%s' % list(fspec.checksum.items())[0]]  # Python 2/3
+            cmd += ['-K', '%s:%s' % next(iter(fspec.checksum.items()))]
 
         cmd += [source, destination]
 
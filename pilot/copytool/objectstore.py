@@ -104,6 +104,15 @@ def resolve_surl(fspec: Any, protocol: dict, ddmconf: dict, **kwargs: dict) -> d
     return {'surl': surl}
 
 
+def get_rucio_env() -> dict:
+    """
+    Return the environment to be used for rucio commands.
+
+    :return: copy of the current environment with RUCIO_LOGGING_FORMAT set (dict).
+    """
+    return dict(os.environ, RUCIO_LOGGING_FORMAT='%(asctime)s %(levelname)s [%(message)s]')
+
+
 def copy_in(files: list, **kwargs: dict) -> list:
     """
     Download given files using rucio copytool.
@@ -113,10 +122,14 @@ def copy_in(files: list, **kwargs: dict) -> list:
     :return: updated list of files (list).
     """
     # don't spoil the output, we depend on stderr parsing
-    os.environ['RUCIO_LOGGING_FORMAT'] = '%(asctime)s %(levelname)s [%(message)s]'
+    # (set in the environment of the rucio commands only - os.environ is shared by all pilot threads)
+    kwargs['env'] = get_rucio_env()
 
     ddmconf = kwargs.pop('ddmconf', {})
 
+    # temporary hack (resolved once, since it requires running the rucio command)
+    rses_option = '--rses' if is_new_rucio_version() else '--rse'
+
     for fspec in files:
 
         cmd = []
@@ -128,9 +141,6 @@ def copy_in(files: list, **kwargs: dict) -> list:
                 if ddm_special_setup:
                     cmd = [ddm_special_setup]
 
-        # temporary hack
-        rses_option = '--rses' if is_new_rucio_version() else '--rse'
-
         dst = fspec.workdir or kwargs.get('workdir') or '.'
         cmd += ['/usr/bin/env', 'rucio', '-v', 'download', '--no-subdir', '--dir', dst]
         if require_replicas:
@@ -179,7 +189,8 @@ def copy_out(files: list, **kwargs: dict) -> list:
     :return: updated list of files (list).
     """
     # don't spoil the output, we depend on stderr parsing
-    os.environ['RUCIO_LOGGING_FORMAT'] = '%(asctime)s %(levelname)s [%(message)s]'
+    # (set in the environment of the rucio commands only - os.environ is shared by all pilot threads)
+    kwargs['env'] = get_rucio_env()
 
     no_register = kwargs.pop('no_register', True)
     summary = kwargs.pop('summary', False)
@@ -27,8 +27,6 @@
 
 """Rucio copy tool."""
 
-from __future__ import absolute_import  # Python 2 (2to3 complains about this)
-
 import json
 import logging
 import os
@@ -60,6 +58,9 @@ require_replicas = True    ## indicates if given copytool requires input replica
 require_protocols = False  ## indicates if given copytool requires protocols to be resolved first for stage-out
 tracing_rucio = False      ## should Rucio send the trace?
 
+# don't spoil the output - the rucio API logger reads the format from the environment every time it logs
+os.environ.setdefault('RUCIO_LOGGING_FORMAT', '%(asctime)s %(levelname)s [%(message)s]')
+
 
 def is_valid_for_copy_in(files: list) -> bool:
     """
@@ -107,9 +108,6 @@ def copy_in(files: list, **kwargs: dict) -> list:
     rucio_host = kwargs.get('rucio_host', '')
     pilot_args = kwargs.get('args')
 
-    # don't spoil the output, we depend on stderr parsing
-    os.environ['RUCIO_LOGGING_FORMAT'] = '%(asctime)s %(levelname)s [%(message)s]'
-
     # note, env vars might be unknown inside middleware contrainers, if so get the value already in the trace report
     localsite = os.environ.get('RUCIO_LOCAL_SITE_ID', trace_report.get_value('localSite'))
     for fspec in files:
@@ -263,9 +261,6 @@ def copy_in_bulk(files: list, **kwargs: dict) -> list:
     trace_common_fields = kwargs.get('trace_report')
     rucio_host = kwargs.get('rucio_host', '')
 
-    # don't spoil the output, we depend on stderr parsing
-    os.environ['RUCIO_LOGGING_FORMAT'] = '%(asctime)s %(levelname)s [%(message)s]'
-
     dst = kwargs.get('workdir') or '.'
 
     # THE DOWNLOAD
@@ -360,10 +355,7 @@ def _get_trace(fspec: Any, traces: list) -> list:
     :return: trace_candidates that correspond to the given file (list).
     """
     try:
-        try:
-            trace_candidates = list(filter(lambda t: t['filename'] == fspec.lfn and t['scope'] == fspec.scope, traces))  # Python 2
-        except Exception:
-            trace_candidates = list([t for t in traces if t['filename'] == fspec.lfn and t['scope'] == fspec.scope])  # Python 3
+        trace_candidates = [t for t in traces if t['filename'] == fspec.lfn and t['scope'] == fspec.scope]
         if trace_candidates:
             return trace_candidates
         else:
@@ -383,8 +375,6 @@ def copy_out(files: list, **kwargs: dict) -> list:  # noqa: C901
     :raise: PilotException in case of controlled error
     :return: updated files list (list).
     """
-    # don't spoil the output, we depend on stderr parsing
-    os.environ['RUCIO_LOGGING_FORMAT'] = '%(asctime)s %(levelname)s [%(message)s]'
     logger.info(f'rucio stage-out: X509_USER_PROXY={os.environ.get("X509_USER_PROXY", "")}')
 
     summary = kwargs.pop('summary', True)
@@ -663,7 +653,7 @@ def _stage_out_api(fspec: Any, summary_file_path: str, trace_report: dict, trace
     """
     ec = 0
 
-    # init. download client
+    # init. upload client
     from rucio.client import Client
     from rucio.client.uploadclient import UploadClient
     # for ATLAS: rucio_host = 'https://voatlasrucio-server-prod.cern.ch:443'
@@ -26,39 +26,73 @@ import json
 import logging
 import os
 import threading
-import time
 import queue
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Any
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 from pilot.common import exception
 from pilot.common.pluginfactory import PluginFactory
 
 logger = logging.getLogger(__name__)
 
+# communicator plugin classes selected with the COMMUNICATOR_PLUGIN environment variable (PanDA by default)
+DEFAULT_PLUGIN_CLASS = 'pilot.eventservice.communicationmanager.plugins.pandacommunicator.PandaCommunicator'
+PLUGIN_CLASSES = {'act': 'pilot.eventservice.communicationmanager.plugins.actcommunicator.ACTCommunicator',
+                  'harvestersf': 'pilot.eventservice.communicationmanager.plugins.harvestersharefilecommunicator.HarvesterShareFileCommunicator'}
+
+
+def dumps(obj: Any) -> str:
+    """
+    Serialize the given object to a JSON string, using the faster orjson module when it is available.
+
+    :param obj: object to serialize (Any)
+    :return: JSON string (str).
+    """
+    if orjson:
+        return orjson.dumps(obj, default=str).decode('utf-8')
+
+    return json.dumps(obj, default=str)
+
 
 class CommunicationResponse:
     """Communication response class."""
 
-    exception = None
+    __slots__ = ('status', 'content', 'exception')
 
-    def __init__(self, attrs: dict = None):
+    def __init__(self, attrs: dict = None, status: Any = None, content: Any = None, exception: Exception = None):
         """
         Initialize variables.
 
-        :param attrs: attributes dictionary (dict).
+        The response can either be defined with an attributes dictionary (for backward compatibility) or with
+        the keyword arguments.
+
+        :param attrs: attributes dictionary (dict)
+        :param status: status code (Any)
+        :param content: response content (Any)
+        :param exception: exception to be raised for the client (Exception).
         """
-        if not attrs:
-            attrs = {}
-        if not isinstance(attrs, dict):
-            attrs = json.loads(attrs)
+        if attrs:
+            status = attrs.get('status', status)
+            content = attrs.get('content', content)
+            exception = attrs.get('exception', exception)
 
-        def_attrs = {'status': None, 'content': None, 'exception': None}
-        for key, value in def_attrs.items():
-            if key not in attrs:
-                attrs[key] = value
+        self.status = status
+        self.content = content
+        self.exception = exception
 
-        for key, value in attrs.items():
-            setattr(self, key, value)
+    @classmethod
+    def from_json(cls, json_str: str) -> Any:
+        """
+        Create a response from a JSON string with the attributes.
+
+        :param json_str: JSON string (str)
+        :return: communication response (CommunicationResponse).
+        """
+        return cls(json.loads(json_str))
 
     def __str__(self) -> str:
         """
@@ -67,7 +101,8 @@ class CommunicationResponse:
         :return: string representation (str).
         """
         json_str = {}
-        for key, value in list(self.__dict__.items()):
+        for key in self.__slots__:
+            value = getattr(self, key)
             if value and isinstance(value, list):
                 json_str[key] = []
                 for list_item in value:
@@ -76,12 +111,17 @@ class CommunicationResponse:
                 json_str[key] = str(value)
             else:
                 json_str[key] = value
-        return json.dumps(json_str)
+        return dumps(json_str)
 
 
 class CommunicationRequest():
     """Communication request class."""
 
+    # defaults for the attributes that are not set by the client
+    num_jobs = 1
+    num_event_ranges = 1
+    jobs = None
+    update_events = None
     post_hook = None
     response = None
 
@@ -93,34 +133,47 @@ class CommunicationRequest():
         RequestEvents = 'request_events'
         UpdateEvents = 'update_events'
 
-    def __init__(self, attrs: dict = None):
+    def __init__(self, attrs: dict = None, **kwargs: Any):
         """
         Initialize variables.
 
-        :param attrs: attributes dictionary (dict).
+        The attributes can be given as a dictionary and/or as keyword arguments (the latter take precedence).
+
+        :param attrs: attributes dictionary (dict)
+        :param kwargs: request attributes (Any).
         """
-        if not attrs:
-            attrs = {}
-        if not isinstance(attrs, dict):
-            attrs = json.loads(attrs)
+        if attrs:
+            self.__dict__.update(attrs)
+        self.__dict__.update(kwargs)
 
-        if attrs['request_type'] == CommunicationRequest.RequestType.RequestJobs:
-            def_attrs = {'num_jobs': 1, 'post_hook': None, 'response': None}
-        if attrs['request_type'] == CommunicationRequest.RequestType.RequestEvents:
-            def_attrs = {'num_event_ranges': 1, 'post_hook': None, 'response': None}
-        if attrs['request_type'] == CommunicationRequest.RequestType.UpdateEvents:
-            def_attrs = {'update_events': None, 'post_hook': None, 'response': None}
-        if attrs['request_type'] == CommunicationRequest.RequestType.UpdateJobs:
-            def_attrs = {'jobs': None, 'post_hook': None, 'response': None}
+        self.abort = False
+        # resolved by the communication manager once the response has been assigned
+        self.future = Future()
 
-        for key, value in def_attrs.items():
-            if key not in attrs:
-                attrs[key] = value
+    @classmethod
+    def from_json(cls, json_str: str) -> Any:
+        """
+        Create a request from a JSON string with the attributes.
 
-        for key in attrs:
-            setattr(self, key, attrs[key])
+        :param json_str: JSON string (str)
+        :return: communication request (CommunicationRequest).
+        """
+        return cls(json.loads(json_str))
 
-        self.abort = False
+    def set_response(self, response: CommunicationResponse):
+        """
+        Assign the response to the request and resolve the future that the client is waiting on.
+
+        The future raises the exception of the response, if any, otherwise it returns the content (or None if the
+        status is False).
+
+        :param response: communication response (CommunicationResponse).
+        """
+        self.response = response
+        if response.exception:
+            self.future.set_exception(response.exception)
+        else:
+            self.future.set_result(None if response.status is False else response.content)
 
     def __str__(self):
         """
@@ -129,7 +182,7 @@ class CommunicationRequest():
         :return: string representation (str).
         """
         json_str = {}
-        for key, value in list(self.__dict__.items()):
+        for key, value in self.__dict__.items():
             if value and isinstance(value, list):
                 json_str[key] = []
                 for list_item in value:
@@ -139,7 +192,7 @@ class CommunicationRequest():
             else:
                 json_str[key] = value
 
-        return json.dumps(json_str)
+        return dumps(json_str)
 
 
 class CommunicationManager(threading.Thread, PluginFactory):
@@ -157,23 +210,30 @@ class CommunicationManager(threading.Thread, PluginFactory):
         self.name = "CommunicationManager"
         self.post_get_jobs = None
         self.post_get_event_ranges_hook = None
-        self.queues = {'request_get_jobs': queue.Queue(),
-                       'update_jobs': queue.Queue(),
-                       'request_get_events': queue.Queue(),
-                       'update_events': queue.Queue(),
-                       'processing_get_jobs': queue.Queue(),
-                       'processing_update_jobs': queue.Queue(),
-                       'processing_get_events': queue.Queue(),
-                       'processing_update_events': queue.Queue()}
-        self.queue_limits = {'request_get_jobs': None,
-                             'update_jobs': None,
-                             'request_get_events': None,
-                             'update_events': None,
-                             'processing_get_jobs': 1,
-                             'processing_update_jobs': 1,
-                             'processing_get_events': 1,
-                             'processing_update_events': 1}
+        # the client request queues are plain unbounded FIFOs, so the cheaper SimpleQueue is sufficient, while only
+        # one request at a time may be in processing (e.g. HarvesterShareFileCommunicator must not overwrite files)
+        self.queues = {'request_get_jobs': queue.SimpleQueue(),
+                       'update_jobs': queue.SimpleQueue(),
+                       'request_get_events': queue.SimpleQueue(),
+                       'update_events': queue.SimpleQueue(),
+                       'processing_get_jobs': queue.Queue(maxsize=1),
+                       'processing_update_jobs': queue.Queue(maxsize=1),
+                       'processing_get_events': queue.Queue(maxsize=1),
+                       'processing_update_events': queue.Queue(maxsize=1)}
+        # number of requests in each processing queue, so that the limits can be checked without the queue locks
+        self.inflight = {'processing_get_jobs': 0,
+                         'processing_update_jobs': 0,
+                         'processing_get_events': 0,
+                         'processing_update_events': 0}
+        self.inflight_lock = threading.Lock()
+        self.communicator = None  # communicator plugin instance, loaded by get_processor()
+        self.processor = None  # processor dictionary, built by get_processor()
         self.stop_event = threading.Event()
+        # notified by the clients when a request has been queued, so that run() does not have to sleep through it
+        self.wakeup = threading.Condition()
+        # set under the wakeup condition together with the notification, so that run() cannot miss a notification that
+        # comes in after it has checked the queues but before it starts waiting
+        self.pending = False
         self.args = args
         self.kwargs = kwargs
 
@@ -182,6 +242,8 @@ class CommunicationManager(threading.Thread, PluginFactory):
         if not self.is_stop():
             logger.info("stopping Communication Manager.")
             self.stop_event.set()
+            with self.wakeup:
+                self.wakeup.notify_all()
 
     def is_stop(self) -> bool:
         """
@@ -203,33 +265,19 @@ class CommunicationManager(threading.Thread, PluginFactory):
         if self.is_stop():
             return None
 
-        req_attrs = {}
-        if args:
-            if not isinstance(args, dict):
-                args = vars(args)
-            for key, value in list(args.items()):
-                req_attrs[key] = value
-
-        other_req_attrs = {'request_type': CommunicationRequest.RequestType.RequestJobs,
-                           'num_jobs': njobs,
-                           'post_hook': post_hook}
-        for key, value in list(other_req_attrs.items()):
-            req_attrs[key] = value
-
-        req = CommunicationRequest(req_attrs)
+        if args and not isinstance(args, dict):
+            args = vars(args)
+        req = CommunicationRequest(args,
+                                   request_type=CommunicationRequest.RequestType.RequestJobs,
+                                   num_jobs=njobs,
+                                   post_hook=post_hook)
         self.queues['request_get_jobs'].put(req)
+        self.wake_up()
 
         if req.post_hook:
             return None
 
-        while req.response is None:
-            time.sleep(1)
-        if req.response.exception:
-            raise req.response.exception
-        if req.response.status is False:
-            return None
-
-        return req.response.content
+        return req.future.result()
 
     def update_jobs(self, jobs: Any, post_hook: Any = None) -> Any:
         """
@@ -245,24 +293,16 @@ class CommunicationManager(threading.Thread, PluginFactory):
         if self.is_stop():
             return None
 
-        req_attrs = {'request_type': CommunicationRequest.RequestType.UpdateJobs,
-                     'jobs': jobs,
-                     'post_hook': post_hook}
-
-        req = CommunicationRequest(req_attrs)
+        req = CommunicationRequest(request_type=CommunicationRequest.RequestType.UpdateJobs,
+                                   jobs=jobs,
+                                   post_hook=post_hook)
         self.queues['update_jobs'].put(req)
+        self.wake_up()
 
         if req.post_hook:
             return None
 
-        while req.response is None:
-            time.sleep(1)
-        if req.response.exception:
-            raise req.response.exception
-        if req.response.status is False:
-            return None
-
-        return req.response.content
+        return req.future.result()
 
     def get_event_ranges(self, num_event_ranges: int = 1, post_hook: Any = None, job: Any = None) -> Any:
         """
@@ -280,37 +320,27 @@ class CommunicationManager(threading.Thread, PluginFactory):
             return None
 
         if not job:
-            resp_attrs = {'status': -1,
-                          'content': None,
-                          'exception': exception.CommunicationFailure(f"get events failed because job info missing "
-                                                                      f"(job: {job})")}
-            resp = CommunicationResponse(resp_attrs)
+            resp = CommunicationResponse(status=-1,
+                                         exception=exception.CommunicationFailure(f"get events failed because job info missing "
+                                                                                  f"(job: {job})"))
             if resp.exception is not None:
                 raise resp.exception
             raise exception.CommunicationFailure(f"get events failed because job info missing (job: {job})")
 
-        req_attrs = {'request_type': CommunicationRequest.RequestType.RequestEvents,
-                     'num_event_ranges': num_event_ranges,
-                     'post_hook': post_hook}
-        req_attrs['jobid'] = job['PandaID']
-        req_attrs['jobsetid'] = job['jobsetID']
-        req_attrs['taskid'] = job['taskID']
-        req_attrs['num_ranges'] = num_event_ranges
-
-        req = CommunicationRequest(req_attrs)
+        req = CommunicationRequest(request_type=CommunicationRequest.RequestType.RequestEvents,
+                                   num_event_ranges=num_event_ranges,
+                                   post_hook=post_hook,
+                                   jobid=job['PandaID'],
+                                   jobsetid=job['jobsetID'],
+                                   taskid=job['taskID'],
+                                   num_ranges=num_event_ranges)
         self.queues['request_get_events'].put(req)
+        self.wake_up()
 
         if req.post_hook:
             return None
 
-        while req.response is None:
-            time.sleep(1)
-        if req.response.exception:
-            raise req.response.exception
-        if req.response.status is False:
-            return None
-
-        return req.response.content
+        return req.future.result()
 
     def update_events(self, update_events: Any, post_hook: Any = None) -> Any:
         """
@@ -326,23 +356,16 @@ class CommunicationManager(threading.Thread, PluginFactory):
         if self.is_stop():
             return None
 
-        req_attrs = {'request_type': CommunicationRequest.RequestType.UpdateEvents,
-                     'update_events': update_events,
-                     'post_hook': post_hook}
-        req = CommunicationRequest(req_attrs)
+        req = CommunicationRequest(request_type=CommunicationRequest.RequestType.UpdateEvents,
+                                   update_events=update_events,
+                                   post_hook=post_hook)
         self.queues['update_events'].put(req)
+        self.wake_up()
 
         if req.post_hook:
             return
 
-        while req.response is None:
-            time.sleep(1)
-        if req.response.exception:
-            raise req.response.exception
-        if req.response.status is False:
-            return None
-        else:
-            return req.response.content
+        return req.future.result()
 
     def get_plugin_confs(self) -> dict:
         """
@@ -350,125 +373,207 @@ class CommunicationManager(threading.Thread, PluginFactory):
 
         :returns: dict with {'class': <plugin_class>} and other items (dict).
         """
-        plugin = os.environ.get('COMMUNICATOR_PLUGIN', None)
-        if not plugin:
-            plugin_confs = {'class': 'pilot.eventservice.communicationmanager.plugins.pandacommunicator.PandaCommunicator'}
-        elif plugin == 'act':
-            plugin_confs = {'class': 'pilot.eventservice.communicationmanager.plugins.actcommunicator.ACTCommunicator'}
-        elif plugin == 'harvestersf':
-            plugin_confs = {'class': 'pilot.eventservice.communicationmanager.plugins.harvestersharefilecommunicator.HarvesterShareFileCommunicator'}
-        else:
-            plugin_confs = {'class': 'pilot.eventservice.communicationmanager.plugins.pandacommunicator.PandaCommunicator'}
-
+        plugin_confs = {'class': PLUGIN_CLASSES.get(os.environ.get('COMMUNICATOR_PLUGIN'), DEFAULT_PLUGIN_CLASS)}
         if self.args:
-            for key, value in list(vars(self.args).items()):
-                plugin_confs[key] = value
+            plugin_confs.update(vars(self.args))
 
         return plugin_confs
 
-    def can_process_request(self, processor: dict, process_type: str) -> bool:
+    def can_process_request(self, next_queue: str) -> bool:
         """
         Check whether it is ready to process request in a type.
 
         For request such as HarvesterShareFileCommunicator, it should check whether there are processing requests to
-        avoid overwriting files.
+        avoid overwriting files (the processing queues are bounded to the allowed number of requests).
 
-        :param processor: processor dictionary (dict)
-        :param process_type: process type (str)
+        :param next_queue: name of the queue the request is moved to after processing, or None (str)
         :return: True or False (bool).
         """
-        if self.queues[process_type].empty():
-            return False
-
-        next_queue = processor[process_type]['next_queue']
-        if next_queue is None or self.queue_limits[next_queue] is None:
-            return True
-
-        if self.queues[next_queue].qsize() < self.queue_limits[next_queue]:
-            return True
-
-        return False
+        return next_queue is None or self.inflight[next_queue] < self.queues[next_queue].maxsize
 
     def get_processor(self) -> dict:
         """
         Get processor dictionary.
 
+        The communicator plugin is only loaded once, later calls (e.g. when the manager is restarted) return the same
+        processor dictionary.
+
         :return: processor dictionary (dict).
         """
-        confs = self.get_plugin_confs()
-        logger.info(f"communication plugin confs: {confs}")
-        communicator = self.get_plugin(confs)
-
-        return {'request_get_jobs': {'pre_check': communicator.pre_check_get_jobs,
-                                     'handler': communicator.request_get_jobs,
-                                     'next_queue': 'processing_get_jobs',
-                                     'process_req_post_hook': False},
-                'request_get_events': {'pre_check': communicator.pre_check_get_events,
-                                       'handler': communicator.request_get_events,
-                                       'next_queue': 'processing_get_events',
-                                       'process_req_post_hook': False},
-                'update_jobs': {'pre_check': communicator.pre_check_update_jobs,
-                                'handler': communicator.update_jobs,
-                                'next_queue': None,
-                                'process_req_post_hook': True},
-                'update_events': {'pre_check': communicator.pre_check_update_events,
-                                  'handler': communicator.update_events,
-                                  'next_queue': None,
-                                  'process_req_post_hook': True},
-                'processing_get_jobs': {'pre_check': communicator.check_get_jobs_status,
-                                        'handler': communicator.get_jobs,
-                                        'next_queue': None,
-                                        'process_req_post_hook': True},
-                'processing_get_events': {'pre_check': communicator.check_get_events_status,
-                                          'handler': communicator.get_events,
+        if self.processor is not None:
+            return self.processor
+
+        if self.communicator is None:
+            confs = self.get_plugin_confs()
+            logger.info(f"communication plugin confs: {confs}")
+            self.communicator = self.get_plugin(confs)
+        communicator = self.communicator
+
+        self.processor = {'request_get_jobs': {'pre_check': communicator.pre_check_get_jobs,
+                                               'handler': communicator.request_get_jobs,
+                                               'next_queue': 'processing_get_jobs',
+                                               'process_req_post_hook': False},
+                          'request_get_events': {'pre_check': communicator.pre_check_get_events,
+                                                 'handler': communicator.request_get_events,
+                                                 'next_queue': 'processing_get_events',
+                                                 'process_req_post_hook': False},
+                          'update_jobs': {'pre_check': communicator.pre_check_update_jobs,
+                                          'handler': communicator.update_jobs,
                                           'next_queue': None,
-                                          'process_req_post_hook': True}
-                }
+                                          'process_req_post_hook': True},
+                          'update_events': {'pre_check': communicator.pre_check_update_events,
+                                            'handler': communicator.update_events,
+                                            'next_queue': None,
+                                            'process_req_post_hook': True},
+                          'processing_get_jobs': {'pre_check': communicator.check_get_jobs_status,
+                                                  'handler': communicator.get_jobs,
+                                                  'next_queue': None,
+                                                  'process_req_post_hook': True},
+                          'processing_get_events': {'pre_check': communicator.check_get_events_status,
+                                                    'handler': communicator.get_events,
+                                                    'next_queue': None,
+                                                    'process_req_post_hook': True}
+                          }
+
+        return self.processor
+
+    def handle_response(self, req: Any, res: Any, next_queue: str, process_req_post_hook: bool):
+        """
+        Deliver the response from the communicator to the request, or move the request to the next queue.
+
+        :param req: communication request (CommunicationRequest)
+        :param res: communication response (CommunicationResponse)
+        :param next_queue: name of the queue that the request should be moved to, or None (str)
+        :param process_req_post_hook: True if the post hook of the request should be called (bool).
+        """
+        if res.status is False:
+            req.set_response(res)
+        else:
+            if next_queue:
+                with self.inflight_lock:
+                    self.inflight[next_queue] += 1
+                self.queues[next_queue].put(req)
+            else:
+                req.set_response(res)
+            if process_req_post_hook and req.post_hook:
+                req.post_hook(res)
+
+    def abort_requests(self, req_queue: Any, req: Any = None):
+        """
+        Abort all requests in the given queue, to release the waiting clients when the manager is stopping.
+
+        :param req_queue: request queue (Any)
+        :param req: request that was already taken from the queue, or None (Any).
+        """
+        while True:
+            if req is not None:
+                logger.info("is going to stop, aborting request: %s", req)
+                req.abort = True
+                # a new exception per request, since raising it in the client adds to its traceback
+                req.set_response(CommunicationResponse(exception=exception.CommunicationFailure("Communication manager is stopping, abort this request")))
+            try:
+                req = req_queue.get_nowait()
+            except queue.Empty:
+                break
+
+    def process_request(self, process_type: str, req: Any, handler: Any, next_queue: str, process_req_post_hook: bool):
+        """
+        Let the communicator handle the given request and deliver the response.
+
+        This function is executed in the thread pool of run(), so that a slow communicator call does not hold up the
+        requests of the other types.
+
+        :param process_type: process type (str)
+        :param req: request (Any)
+        :param handler: communicator function that handles the request (Any)
+        :param next_queue: name of the queue that the request should be moved to, or None (str)
+        :param process_req_post_hook: True if the post hook of the request should be called (bool).
+        """
+        try:
+            logger.debug("processing %s request: %s", process_type, req)
+            res = handler(req)
+        except Exception as exc:
+            logger.warning(f"failed to process {process_type} request: {exc}")
+            # status False makes handle_response() deliver the exception to the client straight away
+            res = CommunicationResponse(status=False, exception=exception.UnknownException(f"failed to process {process_type} request: {exc}"))
+
+        try:
+            logger.debug("processing %s response: %s", process_type, res)
+            self.handle_response(req, res, next_queue, process_req_post_hook)
+        except Exception as exc:
+            logger.warning(f"failed to handle {process_type} response: {exc}")
+
+    def wake_up(self, *args: Any):
+        """
+        Wake up run(), e.g. when a request has been queued or when a communicator call has finished and its process
+        type is free again.
+
+        :param args: ignored (the finished future when used as a done callback) (Any).
+        """
+        with self.wakeup:
+            self.pending = True
+            self.wakeup.notify()
 
     def run(self):
         """Handle communication requests."""
         processor = self.get_processor()
+        # the processor entries do not change while running, so unpack them once
+        dispatch = [(process_type, self.queues[process_type], conf['pre_check'], conf['handler'], conf['next_queue'],
+                     conf['process_req_post_hook'])
+                    for process_type, conf in processor.items()]
+
+        # the communicator calls run in a thread pool, with at most one call per process type at a time (as before,
+        # the requests of one type are processed in order and the processing queue limits are respected)
+        running = {}
+        # requests that were taken from their queue but held back by a failed pre-check (they are retried first)
+        held = {}
+        with ThreadPoolExecutor(max_workers=len(dispatch), thread_name_prefix=self.name) as executor:
+            while True:
+                # clear the flag before the queues are checked, any later wake up will then be seen by the wait below
+                with self.wakeup:
+                    self.pending = False
+                has_req = False
+                for process_type, req_queue, pre_check, handler, next_queue, process_req_post_hook in dispatch:
+                    if self.is_stop():
+                        self.abort_requests(req_queue, held.pop(process_type, None))
+                        continue
+                    if (process_type in running and not running[process_type].done()) or not self.can_process_request(next_queue):
+                        continue
 
-        while True:
-            has_req = False
-            for process_type in processor:
-                if self.is_stop():
-                    while not self.queues[process_type].empty():
-                        req = self.queues[process_type].get()
-                        logger.info(f"is going to stop, aborting request: {req}")
-                        req.abort = True
-                        resp_attrs = {'status': None,
-                                      'content': None,
-                                      'exception': exception.CommunicationFailure("Communication manager is stopping, abort this request")}
-                        req.response = CommunicationResponse(resp_attrs)
-                elif self.can_process_request(processor, process_type):
-                    pre_check_resp = processor[process_type]['pre_check']()
+                    req = held.pop(process_type, None)
+                    if req is None:
+                        try:
+                            req = req_queue.get_nowait()
+                        except queue.Empty:
+                            continue
+
+                    pre_check_resp = pre_check()
                     if not pre_check_resp.status == 0:
+                        held[process_type] = req
                         continue
 
-                    logger.info(f"processing {process_type}")
+                    logger.debug("processing %s", process_type)
 
                     has_req = True
-                    req = self.queues[process_type].get()
-
-                    logger.info(f"processing {process_type} request: {req}")
-                    res = processor[process_type]['handler'](req)
-                    logger.info(f"processing {process_type} respone: {res}")
-
-                    if res.status is False:
-                        req.response = res
-                    else:
-                        next_queue = processor[process_type]['next_queue']
-                        if next_queue:
-                            self.queues[next_queue].put(req)
-                        else:
-                            req.response = res
-                        process_req_post_hook = processor[process_type]['process_req_post_hook']
-                        if process_req_post_hook and req.post_hook:
-                            req.post_hook(res)
-            if not has_req:
-                if self.is_stop():
-                    break
-            time.sleep(1)
+                    if process_type in self.inflight:
+                        with self.inflight_lock:
+                            self.inflight[process_type] -= 1
+                    running[process_type] = executor.submit(self.process_request, process_type, req, handler,
+                                                            next_queue, process_req_post_hook)
+                    # notify run() only once the future is done, otherwise it may still see the process type as busy
+                    running[process_type].add_done_callback(self.wake_up)
+                if not has_req:
+                    if self.is_stop():
+                        break
+                    # nothing could be processed, wait until a new request is queued or a communicator call has
+                    # finished (or for at most one second, since requests in the processing queues are waiting for
+                    # the communicator rather than for a client)
+                    with self.wakeup:
+                        self.wakeup.wait_for(lambda: self.pending or self.is_stop(), timeout=1)
+
+        # the communicator calls that were still running when the stop signal came may have moved requests to the
+        # processing queues, release them as well
+        for req_queue in self.queues.values():
+            self.abort_requests(req_queue)
 
         logger.info("communication manager finished")
@@ -36,6 +36,10 @@ from .basecommunicator import BaseCommunicator
 
 logger = logging.getLogger(__name__)
 
+# shared response for the pre-checks and status checks that always succeed, instead of allocating one per call
+# (it is only read by the communication manager and never handed to a client, so it must not be modified)
+status_ok = CommunicationResponse(status=0)
+
 
 class PandaCommunicator(BaseCommunicator):
     """PanDA communicator class."""
@@ -58,27 +62,27 @@ class PandaCommunicator(BaseCommunicator):
         Check whether it's ok to send a request to get jobs.
 
         :param req: request (Any)
-        :return: CommunicationResponse({'status': 0}) (Any).
+        :return: status_ok response (Any).
         """
-        return CommunicationResponse({'status': 0})
+        return status_ok
 
     def request_get_jobs(self, req: Any) -> Any:
         """
         Send a request to get jobs.
 
         :param req: request (Any)
-        :return: CommunicationResponse({'status': 0}) (Any).
+        :return: status_ok response (Any).
         """
-        return CommunicationResponse({'status': 0})
+        return status_ok
 
     def check_get_jobs_status(self, req: Any = None):
         """
         Check whether jobs are prepared.
 
         :param req: request (Any)
-        :return: CommunicationResponse({'status': 0}) (Any).
+        :return: status_ok response (Any).
         """
-        return CommunicationResponse({'status': 0})
+        return status_ok
 
     def get_data(self, req: Any) -> dict:
         """
@@ -154,34 +158,34 @@ class PandaCommunicator(BaseCommunicator):
         Precheck whether it's ok to send a request to get events.
 
         :param req: request (Any)
-        :return: CommunicationResponse({'status': 0}) (Any).
+        :return: status_ok response (Any).
         """
-        return CommunicationResponse({'status': 0})
+        return status_ok
 
     def request_get_events(self, req: Any) -> Any:
         """
         Send a request to get events.
 
         :param req: request (Any)
-        :return: CommunicationResponse({'status': 0}) (Any).
+        :return: status_ok response (Any).
         """
-        return CommunicationResponse({'status': 0})
+        return status_ok
 
     def check_get_events_status(self, req: Any = None) -> Any:
         """
         Check whether events prepared.
 
         :param req: request (Any)
-        :return: CommunicationResponse({'status': 0}) (Any).
+        :return: status_ok response (Any).
         """
-        return CommunicationResponse({'status': 0})
+        return status_ok
 
     def get_events(self, req: Any) -> Any:
         """
         Get events.
 
         :param req: request (Any)
-        :return: CommunicationResponse({'status': 0}) (Any).
+        :return: communication response with status, content and exception (Any).
         """
         self.get_events_lock.acquire()
 
@@ -226,7 +230,7 @@ class PandaCommunicator(BaseCommunicator):
         Precheck whether it's ok to update events.
 
         :param req: request (Any)
-        :return: CommunicationResponse({'status': 0}) (Any).
+        :return: status_ok response (Any).
         """
         self.update_events_lock.acquire()
         try:
@@ -235,14 +239,14 @@ class PandaCommunicator(BaseCommunicator):
             logger.error(f"Failed to pre_check_update_events: {e}, {traceback.format_exc()}")
         self.update_events_lock.release()
 
-        return CommunicationResponse({'status': 0})
+        return status_ok
 
     def update_events(self, req: Any) -> Any:
         """
         Update events.
 
         :param req: request (Any)
-        :return: CommunicationResponse({'status': 0}) (Any).
+        :return: communication response with status, content and exception (Any).
         """
         self.update_events_lock.acquire()
 
@@ -268,7 +272,7 @@ class PandaCommunicator(BaseCommunicator):
         Check whether it's ok to update jobs.
 
         :param req: request (Any)
-        :return: CommunicationResponse({'status': 0}) (Any).
+        :return: status_ok response (Any).
         """
         try:
             self.update_jobs_lock.acquire()
@@ -276,7 +280,7 @@ class PandaCommunicator(BaseCommunicator):
             self.update_jobs_lock.release()
         except Exception as exc:
             logger.error(f"failed in pre_check_update_jobs: {exc}, {traceback.format_exc()}")
-        return CommunicationResponse({'status': 0})
+        return status_ok
 
     def update_job(self, job: Any) -> int:
         """
@@ -301,7 +305,7 @@ class PandaCommunicator(BaseCommunicator):
         Update jobs.
 
         :param req: request (Any)
-        :return: CommunicationResponse({'status': 0}) (Any).
+        :return: communication response with status, content and exception (Any).
         """
         self.update_jobs_lock.acquire()
 
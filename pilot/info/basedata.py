@@ -102,7 +102,11 @@ class BaseData:
                 ## cast to required type and apply default validation
                 hvalidator = validators.get(ktype, validators.get(None))
                 if callable(hvalidator):
-                    value = hvalidator(raw, ktype, kname, defval=copy.deepcopy(getattr(self, kname, None)))
+                    # only mutable containers need a private copy of the default value (deepcopy is expensive)
+                    defval = getattr(self, kname, None)
+                    if isinstance(defval, (list, dict, set)):
+                        defval = copy.deepcopy(defval)
+                    value = hvalidator(raw, ktype, kname, defval=defval)
                 ## apply custom validation if defined
                 hvalidator = getattr(self, f'clean__{kname}', None)
                 if callable(hvalidator):
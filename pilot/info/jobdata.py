@@ -370,14 +370,17 @@ class JobData(BaseData):
         log_lfn = data.get('logFile')
         if log_lfn:
             # unify scopeOut structure: add scope of log file
+            # (consume the scopes with an iterator - popping from the front of the list is O(n) per file)
             scope_out = []
+            scopes = iter(ksources['scopeOut'])
             for lfn in ksources.get('outFiles', []):
                 if lfn == log_lfn:
                     scope_out.append(data.get('scopeLog'))
                 else:
-                    if not ksources['scopeOut']:
+                    scope = next(scopes, None)
+                    if scope is None:
                         raise Exception('Failed to extract scopeOut parameter from Job structure sent by Panda, please check input format!')
-                    scope_out.append(ksources['scopeOut'].pop(0))
+                    scope_out.append(scope)
             ksources['scopeOut'] = scope_out
 
         return self._get_all_output(ksources, kmap, log_lfn, data)
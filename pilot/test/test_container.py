@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+"""Unit tests for the command execution functions."""
+
+import os
+import tempfile
+import unittest
+
+from pilot.util.container import (
+    execute,
+    execute2
+)
+
+
+class TestContainer(unittest.TestCase):
+    """Unit tests for execute() and execute2()."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.stdout_path = os.path.join(self.tmpdir.name, 'stdout.txt')
+        self.stderr_path = os.path.join(self.tmpdir.name, 'stderr.txt')
+
+    def tearDown(self):
+        """Remove the test fixtures."""
+        self.tmpdir.cleanup()
+
+    def read(self, path: str) -> str:
+        """
+        Return the content of the given file.
+
+        :param path: file path (str)
+        :return: file content (str).
+        """
+        with open(path, 'r', encoding='utf-8') as _fd:
+            return _fd.read()
+
+    def test_execute(self):
+        """Verify that execute() returns the exit code and the output of the command."""
+        exit_code, stdout, stderr = execute('echo hi; echo there >&2', mute=True)
+
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(stdout, 'hi')
+        self.assertEqual(stderr, 'there\n')
+
+    def test_execute_returnproc_with_files(self):
+        """Verify that execute() accepts stdout and stderr files when the process is returned."""
+        with open(self.stdout_path, 'w', encoding='utf-8') as stdout, \
+                open(self.stderr_path, 'w', encoding='utf-8') as stderr:
+            process = execute('echo hi; echo there >&2', mute=True, returnproc=True, stdout=stdout, stderr=stderr)
+            self.assertIsNotNone(process)
+            self.assertEqual(process.wait(timeout=60), 0)
+
+        self.assertEqual(self.read(self.stdout_path), 'hi\n')
+        self.assertEqual(self.read(self.stderr_path), 'there\n')
+
+    def test_execute2(self):
+        """Verify that execute2() writes the output of the command to the given files."""
+        with open(self.stdout_path, 'w', encoding='utf-8') as stdout, \
+                open(self.stderr_path, 'w', encoding='utf-8') as stderr:
+            exit_code = execute2('echo hi; echo there >&2', stdout, stderr, 60, mute=True)
+
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(self.read(self.stdout_path), 'hi\n')
+        self.assertEqual(self.read(self.stderr_path), 'there\n')
+
+
+if __name__ == '__main__':
+    unittest.main()
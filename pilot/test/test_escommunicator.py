@@ -26,10 +26,13 @@ import logging
 import os
 import socket
 import sys
+import threading
 import time
 import unittest
 
+from pilot.common.exception import CommunicationFailure, UnknownException
 from pilot.eventservice.communicationmanager.communicationmanager import CommunicationRequest, CommunicationResponse, CommunicationManager
+from pilot.eventservice.communicationmanager.plugins.basecommunicator import BaseCommunicator
 from pilot.util.https import https_setup
 from pilot.util.timing import time_stamp
 
@@ -170,3 +173,238 @@ class TestESCommunicationManagerPanda(unittest.TestCase):
             if communicator_manager:
                 communicator_manager.stop()
             raise exc
+
+
+class StubCommunicator(BaseCommunicator):
+    """Communicator that answers all requests locally, used to test the communication manager."""
+
+    def __init__(self, *args, **kwargs):
+        """
+        Initialize variables.
+
+        :param args: args object (Any)
+        :param kwargs: kwargs dictionary (dict)
+        """
+        super().__init__(*args, **kwargs)
+        self.get_jobs_ready = threading.Event()  # check_get_jobs_status() fails until this is set
+        self.get_jobs_ready.set()
+        self.release_get_jobs = threading.Event()  # get_jobs() blocks until this is set
+        self.release_get_jobs.set()
+        self.fail = set()  # names of the handlers that should raise an exception
+
+    def ok(self, req=None):
+        """
+        Return a successful response.
+
+        :param req: request (Any)
+        :return: response (CommunicationResponse).
+        """
+        return CommunicationResponse(status=0)
+
+    pre_check_get_jobs = pre_check_get_events = pre_check_update_jobs = pre_check_update_events = ok
+    check_get_events_status = ok
+
+    def check_failure(self, name):
+        """
+        Raise an exception if the given handler should fail.
+
+        :param name: handler name (str).
+        """
+        if name in self.fail:
+            raise RuntimeError(f'{name} failed')
+
+    def request_get_jobs(self, req):
+        """
+        Accept a get jobs request.
+
+        :param req: request (Any)
+        :return: response (CommunicationResponse).
+        """
+        self.check_failure('request_get_jobs')
+        return self.ok()
+
+    def check_get_jobs_status(self, req=None):
+        """
+        Check whether the jobs are ready.
+
+        :param req: request (Any)
+        :return: response (CommunicationResponse).
+        """
+        return CommunicationResponse(status=0 if self.get_jobs_ready.is_set() else 1)
+
+    def get_jobs(self, req):
+        """
+        Return the requested number of jobs.
+
+        :param req: request (Any)
+        :return: response (CommunicationResponse).
+        """
+        self.release_get_jobs.wait(10)
+        return CommunicationResponse(status=0, content=[{'PandaID': i} for i in range(req.num_jobs)])
+
+    def update_jobs(self, req):
+        """
+        Update jobs.
+
+        :param req: request (Any)
+        :return: response (CommunicationResponse).
+        """
+        self.check_failure('update_jobs')
+        return CommunicationResponse(status=0, content=[True for _ in req.jobs])
+
+    def request_get_events(self, req):
+        """
+        Accept a get events request.
+
+        :param req: request (Any)
+        :return: response (CommunicationResponse).
+        """
+        self.check_failure('request_get_events')
+        return self.ok()
+
+    def get_events(self, req):
+        """
+        Return the requested number of event ranges.
+
+        :param req: request (Any)
+        :return: response (CommunicationResponse).
+        """
+        return CommunicationResponse(status=0, content=[{'eventRangeID': i} for i in range(req.num_event_ranges)])
+
+    def update_events(self, req):
+        """
+        Update events.
+
+        :param req: request (Any)
+        :return: response (CommunicationResponse).
+        """
+        return CommunicationResponse(status=0, content={'StatusCode': 0})
+
+
+class TestESCommunicationManager(unittest.TestCase):
+    """Unit tests for event service communicator manager, using a stub communicator."""
+
+    job = {'PandaID': 1, 'jobsetID': 2, 'taskID': 3}
+
+    def setUp(self):
+        """Start a communication manager with a stub communicator."""
+        self.communicator = StubCommunicator()
+        self.communicator_manager = CommunicationManager()
+        self.communicator_manager.communicator = self.communicator
+        self.communicator_manager.start()
+
+    def tearDown(self):
+        """Stop the communication manager."""
+        self.communicator.get_jobs_ready.set()
+        self.communicator.release_get_jobs.set()
+        self.communicator_manager.stop()
+        self.communicator_manager.join(10)
+        self.assertFalse(self.communicator_manager.is_alive())
+
+    def run_client(self, func, *args, **kwargs):
+        """
+        Call the given client function in a separate thread.
+
+        :param func: client function (Any)
+        :param args: arguments (Any)
+        :param kwargs: keyword arguments (Any)
+        :return: thread (threading.Thread), result list with the return value or the raised exception (list).
+        """
+        result = []
+
+        def _client():
+            try:
+                result.append(func(*args, **kwargs))
+            except Exception as exc:
+                result.append(exc)
+
+        thread = threading.Thread(target=_client)
+        thread.start()
+        return thread, result
+
+    def test_requests(self):
+        """Make sure that the responses of the communicator are returned to the clients."""
+        jobs = self.communicator_manager.get_jobs(njobs=2)
+        self.assertEqual(jobs, [{'PandaID': 0}, {'PandaID': 1}])
+
+        status = self.communicator_manager.update_jobs(jobs=jobs)
+        self.assertEqual(status, [True, True])
+
+        events = self.communicator_manager.get_event_ranges(num_event_ranges=3, job=self.job)
+        self.assertEqual(len(events), 3)
+
+        res = self.communicator_manager.update_events(update_events={'version': 0, 'eventRanges': '[]'})
+        self.assertEqual(res['StatusCode'], 0)
+
+    def test_post_hook(self):
+        """Make sure that the post hook is called with the response instead of blocking the client."""
+        responses = []
+        hook_called = threading.Event()
+
+        def post_hook(res):
+            responses.append(res)
+            hook_called.set()
+
+        self.assertIsNone(self.communicator_manager.update_jobs(jobs=[{}], post_hook=post_hook))
+        self.assertTrue(hook_called.wait(10))
+        self.assertEqual(responses[0].content, [True])
+
+    def test_handler_exception(self):
+        """Make sure that an exception in the communicator is raised in the client."""
+        self.communicator.fail.update({'request_get_events', 'request_get_jobs', 'update_jobs'})
+
+        self.assertRaises(UnknownException, self.communicator_manager.get_event_ranges, num_event_ranges=1, job=self.job)
+        self.assertRaises(UnknownException, self.communicator_manager.get_jobs, njobs=1)
+        self.assertRaises(UnknownException, self.communicator_manager.update_jobs, jobs=[{}])
+
+        # the failed requests must not be left in processing
+        self.assertEqual(set(self.communicator_manager.inflight.values()), {0})
+
+        # the manager continues to process requests after a failure
+        self.communicator.fail.clear()
+        self.assertEqual(self.communicator_manager.get_jobs(njobs=1), [{'PandaID': 0}])
+
+    def test_held_request(self):
+        """Make sure that a request is processed once the pre-check of its process type succeeds."""
+        self.communicator.get_jobs_ready.clear()
+        thread, result = self.run_client(self.communicator_manager.get_jobs, njobs=1)
+        time.sleep(0.5)
+        self.assertEqual(result, [])
+
+        self.communicator.get_jobs_ready.set()
+        thread.join(10)
+        self.assertEqual(result, [[{'PandaID': 0}]])
+
+    def test_slow_request(self):
+        """Make sure that a slow communicator call does not hold up the requests of the other types."""
+        self.communicator.release_get_jobs.clear()
+        thread, result = self.run_client(self.communicator_manager.get_jobs, njobs=1)
+
+        res = self.communicator_manager.update_events(update_events={'version': 0, 'eventRanges': '[]'})
+        self.assertEqual(res['StatusCode'], 0)
+        self.assertEqual(result, [])
+
+        self.communicator.release_get_jobs.set()
+        thread.join(10)
+        self.assertEqual(result, [[{'PandaID': 0}]])
+
+    def test_stop(self):
+        """Make sure that the queued requests are aborted when the manager stops."""
+        self.communicator.get_jobs_ready.clear()
+        clients = [self.run_client(self.communicator_manager.get_jobs, njobs=1) for _ in range(2)]
+        time.sleep(0.5)
+
+        self.communicator_manager.stop()
+        self.communicator_manager.join(10)
+        self.assertFalse(self.communicator_manager.is_alive())
+
+        exceptions = []
+        for thread, result in clients:
+            thread.join(10)
+            self.assertEqual(len(result), 1)
+            self.assertIsInstance(result[0], CommunicationFailure)
+            exceptions.append(result[0])
+        self.assertIsNot(exceptions[0], exceptions[1])
+
+        # new requests are not accepted once the manager has stopped
+        self.assertIsNone(self.communicator_manager.get_jobs(njobs=1))
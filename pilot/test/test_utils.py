@@ -22,9 +22,21 @@
 """Unit tests for pilot utils."""
 
 import os
+import tempfile
 import unittest
+from pathlib import Path
+from unittest import mock
 
+from pilot.common.exception import (
+    FileHandlingFailure,
+    NoSuchFile
+)
 from pilot.info import infosys
+from pilot.util.auxiliary import (
+    extract_memory_usage_value,
+    get_memory_usage
+)
+from pilot.util.filehandling import copy
 from pilot.util.workernode import (
     collect_workernode_info,
     get_disk_space
@@ -73,5 +85,91 @@ class TestUtils(unittest.TestCase):
         self.assertEqual(type(diskspace), int)
 
 
+@unittest.skipIf(not check_env(), "This unit test requires /proc (not available on macOS)")
+class TestMemoryUsage(unittest.TestCase):
+    """Unit tests for the memory usage functions."""
+
+    status = "Name:\tpython\nVmPeak:\t  200000 kB\nVmRSS:\t  152832 kB\nThreads:\t1\n"
+
+    def test_get_memory_usage(self):
+        """Verify that get_memory_usage() returns the VmRSS line for a normal status file."""
+        with mock.patch('builtins.open', mock.mock_open(read_data=self.status)):
+            exit_code, stdout, stderr = get_memory_usage(1234)
+
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(stdout, 'VmRSS:\t  152832 kB')
+        self.assertEqual(stderr, '')
+        self.assertEqual(extract_memory_usage_value(stdout), 152832)
+
+    def test_get_memory_usage_own_process(self):
+        """Verify that the memory usage of the current process can be read."""
+        exit_code, stdout, _ = get_memory_usage(os.getpid())
+
+        self.assertEqual(exit_code, 0)
+        self.assertGreater(extract_memory_usage_value(stdout), 0)
+
+    def test_get_memory_usage_missing_vmrss(self):
+        """Verify that a status file without a VmRSS line (e.g. a zombie process) gives no value."""
+        status = self.status.replace("VmRSS:\t  152832 kB\n", "")
+        with mock.patch('builtins.open', mock.mock_open(read_data=status)):
+            exit_code, stdout, stderr = get_memory_usage(1234)
+
+        self.assertEqual(exit_code, 1)
+        self.assertEqual(stdout, '')
+        self.assertEqual(stderr, 'VmRSS not found')
+        self.assertEqual(extract_memory_usage_value(stdout), 0)
+        self.assertEqual(extract_memory_usage_value(status), 0)
+
+    def test_get_memory_usage_nonexistent_pid(self):
+        """Verify that get_memory_usage() reports an error for a pid that does not exist."""
+        with open('/proc/sys/kernel/pid_max', 'r', encoding='utf-8') as _fd:
+            pid = int(_fd.read()) + 1
+
+        exit_code, stdout, stderr = get_memory_usage(pid)
+
+        self.assertEqual(exit_code, 1)
+        self.assertEqual(stdout, '')
+        self.assertNotEqual(stderr, '')
+        self.assertEqual(extract_memory_usage_value(stdout), 0)
+
+
+class TestCopy(unittest.TestCase):
+    """Unit tests for the file copy function."""
+
+    def setUp(self):
+        """Set up a temporary directory with a source file."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.tmpdir.name, 'source.txt')
+        with open(self.source, 'w', encoding='utf-8') as _fd:
+            _fd.write('data')
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        self.tmpdir.cleanup()
+
+    def test_copy(self):
+        """Verify that copy() copies a file given as str or as Path."""
+        for source in (self.source, Path(self.source)):
+            destination = os.path.join(self.tmpdir.name, 'destination.txt')
+            copy(source, destination)
+            with open(destination, 'r', encoding='utf-8') as _fd:
+                self.assertEqual(_fd.read(), 'data')
+            os.remove(destination)
+
+    def test_copy_missing_source(self):
+        """Verify that a missing source file given as str or as Path raises NoSuchFile."""
+        missing = os.path.join(self.tmpdir.name, 'missing.txt')
+        for source in (missing, Path(missing)):
+            with self.assertRaises(NoSuchFile):
+                copy(source, self.tmpdir.name)
+
+    def test_copy_missing_destination(self):
+        """Verify that a missing destination directory raises FileHandlingFailure."""
+        destination = os.path.join(self.tmpdir.name, 'missing', 'destination.txt')
+        for source in (self.source, Path(self.source)):
+            with self.assertRaises(FileHandlingFailure):
+                copy(source, destination)
+
+
 if __name__ == '__main__':
     unittest.main()
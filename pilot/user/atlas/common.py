@@ -1553,11 +1553,8 @@ def remove_no_output_files(job: Any):
 
     # now remove the unwanted fspecs
     if len(_outfiles) != len(job.outdata):
-        outdata = []
-        for fspec in job.outdata:
-            if fspec.lfn in _outfiles:
-                outdata.append(fspec)
-        job.outdata = outdata
+        _outfiles = set(_outfiles)
+        job.outdata = [fspec for fspec in job.outdata if fspec.lfn in _outfiles]
 
 
 def get_outfiles_records(subfiles: list) -> dict:
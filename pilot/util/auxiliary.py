@@ -23,14 +23,14 @@
 
 import logging
 import os
+import pwd
 import re
 import socket
 import sys
+import threading
 
-from collections.abc import Set, Mapping
-from collections import deque, OrderedDict
-from numbers import Number
-from time import sleep
+from collections import deque
+from functools import lru_cache
 from typing import Any
 
 from pilot.util.constants import (
@@ -43,27 +43,80 @@ from pilot.util.constants import (
 )
 from pilot.common.errorcodes import ErrorCodes
 from pilot.util.container import execute
-from pilot.util.filehandling import dump
 
-zero_depth_bases = (str, bytes, Number, range, bytearray)
-iteritems = 'items'
+scalar_types = frozenset((str, bytes, bytearray, int, float, bool, type(None)))  # types without members
 logger = logging.getLogger(__name__)
 errors = ErrorCodes()
+server_update_done = threading.Event()  # set while SERVER_UPDATE is SERVER_UPDATE_FINAL or SERVER_UPDATE_TROUBLE
+
+# precompiled regular expressions
+GLOBALJOBID_PATTERN = re.compile(r'^GlobalJobId\s*=\s*"(.*)"')  # HTCondor job classad
+GDB_PID_PATTERN = re.compile(r'gdb --pid (\d+)')  # gdb debug command
+VENDOR_PRODUCT_PATTERN = re.compile(r'(vendor|product)\:\ (.+)\ .')  # lshw output
+
+# batch system job id env variables, in the order they are checked by get_batchsystem_jobid()
+BATCHSYSTEM_JOBID_VARIABLES = {'QSUB_REQNAME': 'BQS',  # BQS (e.g. LYON)
+                               'BQSCLUSTER': 'BQS',  # BQS alternative
+                               'PBS_JOBID': 'Torque',
+                               'LSB_JOBID': 'LSF',
+                               'JOB_ID': 'Grid Engine',  # Sun's Grid Engine
+                               'clusterid': 'Condor',  # Condor (variable sent through job submit file)
+                               'SLURM_JOB_ID': 'SLURM',
+                               'K8S_JOB_ID': 'Kubernetes'}
+
+# error code translation dictionary (used by shell_exit_code() and convert_to_pilot_error_code())
+# FORMAT: { pilot_error_code : [ shell_error_code, meaning ], .. }
+# Restricting user (pilot) exit codes to the range 64 - 113, as suggested by http://tldp.org/LDP/abs/html/exitcodes.html
+# Using exit code 137 for kill signal error codes (this actually means a hard kill signal 9, (128+9), 128+2 would mean CTRL+C)
+ERROR_CODE_TRANSLATION = {
+    -1: [64, "Site offline"],
+    errors.GENERALERROR: [65, "General pilot error, consult batch log"],  # added to traces object
+    errors.MKDIR: [66, "Could not create directory"],  # added to traces object
+    errors.NOSUCHFILE: [67, "No such file or directory"],  # added to traces object
+    errors.NOVOMSPROXY: [68, "Voms proxy not valid"],  # added to traces object
+    errors.NOPROXY: [68, "Proxy not valid"],  # added to traces object
+    errors.CERTIFICATEHASEXPIRED: [68, "Proxy not valid"],
+    errors.NOLOCALSPACE: [69, "No space left on local disk"],  # added to traces object
+    errors.UNKNOWNEXCEPTION: [70, "Exception caught by pilot"],  # added to traces object
+    errors.QUEUEDATA: [71, "Pilot could not download queuedata"],  # tested
+    errors.QUEUEDATANOTOK: [72, "Pilot found non-valid queuedata"],  # not implemented yet, error code added
+    errors.NOSOFTWAREDIR: [73, "Software directory does not exist"],  # added to traces object
+    errors.JSONRETRIEVALTIMEOUT: [74, "JSON retrieval timed out"],  # ..
+    errors.BLACKHOLE: [75, "Black hole detected in file system"],  # ..
+    errors.MIDDLEWAREIMPORTFAILURE: [76, "Failed to import middleware module"],  # added to traces object
+    errors.MISSINGINPUTFILE: [77, "Missing input file in SE"],  # should pilot report this type of error to wrapper?
+    errors.PANDAQUEUENOTACTIVE: [78, "PanDA queue is not active"],
+    errors.COMMUNICATIONFAILURE: [79, "PanDA server communication failure"],
+    errors.CVMFSISNOTALIVE: [64, "CVMFS is not responding"],  # same exit code as site offline
+    errors.KILLSIGNAL: [137, "General kill signal"],  # Job terminated by unknown kill signal
+    errors.SIGTERM: [143, "Job killed by signal: SIGTERM"],  # 128+15
+    errors.SIGQUIT: [131, "Job killed by signal: SIGQUIT"],  # 128+3
+    errors.SIGSEGV: [139, "Job killed by signal: SIGSEGV"],  # 128+11
+    errors.SIGXCPU: [152, "Job killed by signal: SIGXCPU"],  # 128+24
+    errors.SIGUSR1: [138, "Job killed by signal: SIGUSR1"],  # 128+10
+    errors.SIGINT: [130, "Job killed by signal: SIGINT"],  # 128+2
+    errors.SIGBUS: [135, "Job killed by signal: SIGBUS"]   # 128+7
+}
+
+# inverse of the above, { shell_error_code: [ pilot_error_code, .. ], .. } (in the same order)
+SHELL_TO_PILOT_ERROR_CODES = {shell_code: [pilot_code for pilot_code, value in ERROR_CODE_TRANSLATION.items() if value[0] == shell_code]
+                              for shell_code, _ in ERROR_CODE_TRANSLATION.values()}
 
 
 def pilot_version_banner() -> None:
     """Print a pilot version banner."""
     version = f'***  PanDA Pilot version {get_pilot_version()}  ***'
-    logger.info('*' * len(version))
+    bar = '*' * len(version)
+    logger.info(bar)
     logger.info(version)
-    logger.info('*' * len(version))
+    logger.info(bar)
     logger.info('')
 
     if is_virtual_machine():
         logger.info('pilot is running in a VM')
 
     display_architecture_info()
-    logger.info('*' * len(version))
+    logger.info(bar)
 
 
 def is_virtual_machine() -> bool:
@@ -75,23 +128,18 @@ def is_virtual_machine() -> bool:
 
     :return: True is virtual machine, False otherwise (bool).
     """
-    status = False
-
     # look for 'hypervisor' in cpuinfo
-    with open("/proc/cpuinfo", "r", encoding='utf-8') as _fd:
-        lines = _fd.readlines()
-        for line in lines:
-            if "hypervisor" in line:
-                status = True
-                break
-
-    return status
+    return "hypervisor" in _read_cpuinfo()[0]
 
 
 def display_architecture_info() -> None:
     """Display OS/architecture information from /etc/os-release."""
     logger.info("architecture information:")
-    dump("/etc/os-release")
+    try:
+        with open("/etc/os-release", "r", encoding='utf-8') as _fd:
+            logger.info(f"/etc/os-release:\n{_fd.read()}")
+    except OSError as exc:
+        logger.info(f"failed to read /etc/os-release: {exc}")
 
 
 def get_batchsystem_jobid() -> (str, int):
@@ -100,19 +148,9 @@ def get_batchsystem_jobid() -> (str, int):
 
     :return: batch system name (string), batch system job id (int)
     """
-    # BQS (e.g. LYON)
-    batchsystem_dict = {'QSUB_REQNAME': 'BQS',
-                        'BQSCLUSTER': 'BQS',  # BQS alternative
-                        'PBS_JOBID': 'Torque',
-                        'LSB_JOBID': 'LSF',
-                        'JOB_ID': 'Grid Engine',  # Sun's Grid Engine
-                        'clusterid': 'Condor',  # Condor (variable sent through job submit file)
-                        'SLURM_JOB_ID': 'SLURM',
-                        'K8S_JOB_ID': 'Kubernetes'}
-
-    for key, value in list(batchsystem_dict.items()):
+    for key, value in BATCHSYSTEM_JOBID_VARIABLES.items():
         if key in os.environ:
-            return value, os.environ.get(key, '')
+            return value, os.environ[key]
 
     # Condor (get jobid from classad file)
     if '_CONDOR_JOB_AD' in os.environ:
@@ -134,7 +172,10 @@ def get_globaljobid() -> str:
     ret = ""
     with open(os.environ.get("_CONDOR_JOB_AD"), 'r', encoding='utf-8') as _fp:
         for line in _fp:
-            res = re.search(r'^GlobalJobId\s*=\s*"(.*)"', line)
+            # cheap substring test first, most classad lines do not contain the attribute
+            if 'GlobalJobId' not in line:
+                continue
+            res = GLOBALJOBID_PATTERN.match(line)
             if res is None:
                 continue
             try:
@@ -159,50 +200,23 @@ def whoami() -> str:
     """
     Return the name of the pilot user.
 
-    :return: whoami output (string).
+    :return: user name of the effective user id, like the whoami command (string).
     """
-    _, who_am_i, _ = execute('whoami', mute=True)
+    try:
+        who_am_i = pwd.getpwuid(os.geteuid()).pw_name
+    except KeyError:  # uid without a passwd entry
+        who_am_i = ''
 
     return who_am_i
 
 
 def get_error_code_translation_dictionary() -> dict:
     """
-    Define the error code translation dictionary.
+    Return the error code translation dictionary.
 
     :return: populated error code translation dictionary.
     """
-    error_code_translation_dictionary = {
-        -1: [64, "Site offline"],
-        errors.GENERALERROR: [65, "General pilot error, consult batch log"],  # added to traces object
-        errors.MKDIR: [66, "Could not create directory"],  # added to traces object
-        errors.NOSUCHFILE: [67, "No such file or directory"],  # added to traces object
-        errors.NOVOMSPROXY: [68, "Voms proxy not valid"],  # added to traces object
-        errors.NOPROXY: [68, "Proxy not valid"],  # added to traces object
-        errors.CERTIFICATEHASEXPIRED: [68, "Proxy not valid"],
-        errors.NOLOCALSPACE: [69, "No space left on local disk"],  # added to traces object
-        errors.UNKNOWNEXCEPTION: [70, "Exception caught by pilot"],  # added to traces object
-        errors.QUEUEDATA: [71, "Pilot could not download queuedata"],  # tested
-        errors.QUEUEDATANOTOK: [72, "Pilot found non-valid queuedata"],  # not implemented yet, error code added
-        errors.NOSOFTWAREDIR: [73, "Software directory does not exist"],  # added to traces object
-        errors.JSONRETRIEVALTIMEOUT: [74, "JSON retrieval timed out"],  # ..
-        errors.BLACKHOLE: [75, "Black hole detected in file system"],  # ..
-        errors.MIDDLEWAREIMPORTFAILURE: [76, "Failed to import middleware module"],  # added to traces object
-        errors.MISSINGINPUTFILE: [77, "Missing input file in SE"],  # should pilot report this type of error to wrapper?
-        errors.PANDAQUEUENOTACTIVE: [78, "PanDA queue is not active"],
-        errors.COMMUNICATIONFAILURE: [79, "PanDA server communication failure"],
-        errors.CVMFSISNOTALIVE: [64, "CVMFS is not responding"],  # same exit code as site offline
-        errors.KILLSIGNAL: [137, "General kill signal"],  # Job terminated by unknown kill signal
-        errors.SIGTERM: [143, "Job killed by signal: SIGTERM"],  # 128+15
-        errors.SIGQUIT: [131, "Job killed by signal: SIGQUIT"],  # 128+3
-        errors.SIGSEGV: [139, "Job killed by signal: SIGSEGV"],  # 128+11
-        errors.SIGXCPU: [152, "Job killed by signal: SIGXCPU"],  # 128+24
-        errors.SIGUSR1: [138, "Job killed by signal: SIGUSR1"],  # 128+10
-        errors.SIGINT: [130, "Job killed by signal: SIGINT"],  # 128+2
-        errors.SIGBUS: [135, "Job killed by signal: SIGBUS"]   # 128+7
-    }
-
-    return error_code_translation_dictionary
+    return ERROR_CODE_TRANSLATION
 
 
 def convert_signal_to_exit_code(signal: str) -> int:
@@ -243,17 +257,10 @@ def shell_exit_code(exit_code: int) -> int:
     :param exit_code: pilot error code (int)
     :return: standard shell exit code (int).
     """
-    # Error code translation dictionary
-    # FORMAT: { pilot_error_code : [ shell_error_code, meaning ], .. }
-
-    # Restricting user (pilot) exit codes to the range 64 - 113, as suggested by http://tldp.org/LDP/abs/html/exitcodes.html
-    # Using exit code 137 for kill signal error codes (this actually means a hard kill signal 9, (128+9), 128+2 would mean CTRL+C)
-
-    error_code_translation_dictionary = get_error_code_translation_dictionary()
-
     ret = FAILURE
-    if exit_code in error_code_translation_dictionary:
-        ret = error_code_translation_dictionary.get(exit_code)[0]  # Only return the shell exit code, not the error meaning
+    translation = ERROR_CODE_TRANSLATION.get(exit_code)
+    if translation is not None:
+        ret = translation[0]  # Only return the shell exit code, not the error meaning
     elif exit_code != 0:
         print(f"no translation to shell exit code for error code {exit_code}")
     else:
@@ -270,9 +277,7 @@ def convert_to_pilot_error_code(exit_code: int) -> int:
     :param exit_code: batch system exit code (int)
     :return: pilot error code (int).
     """
-    error_code_translation_dictionary = get_error_code_translation_dictionary()
-
-    list_of_keys = [key for (key, value) in error_code_translation_dictionary.items() if value[0] == exit_code]
+    list_of_keys = SHELL_TO_PILOT_ERROR_CODES.get(exit_code, [])
     # note: do not use logging object as this function is used by Harvester
     if not list_of_keys:
         print(f'unknown exit code: {exit_code} (no matching pilot error code)')
@@ -283,50 +288,6 @@ def convert_to_pilot_error_code(exit_code: int) -> int:
     return list_of_keys[0]
 
 
-def get_size(obj_0: Any) -> int:
-    """
-    Recursively iterate to sum size of object and members.
-
-    Note: for size measurement to work, the object must have set the data members in the __init__().
-
-    :param obj_0: object to be measured.
-    :return: size in Bytes (int).
-    """
-    _seen_ids = set()
-
-    def inner(obj):
-        obj_id = id(obj)
-        if obj_id in _seen_ids:
-            return 0
-
-        _seen_ids.add(obj_id)
-        size = sys.getsizeof(obj)
-        if isinstance(obj, zero_depth_bases):
-            pass  # bypass remaining control flow and return
-        elif isinstance(obj, OrderedDict):
-            pass  # can currently not handle this
-        elif isinstance(obj, (tuple, list, Set, deque)):
-            size += sum(inner(i) for i in obj)
-        elif isinstance(obj, Mapping) or hasattr(obj, iteritems):
-            try:
-                size += sum(inner(k) + inner(v) for k, v in getattr(obj, iteritems)())
-            except Exception:  # as exc
-                pass
-                # <class 'collections.OrderedDict'>: unbound method iteritems() must be called
-                # with OrderedDict instance as first argument (got nothing instead)
-                #logger.debug('exception caught for obj=%s: %s', (str(obj), exc))
-
-        # Check for custom object instances - may subclass above too
-        if hasattr(obj, '__dict__'):
-            size += inner(vars(obj))
-        if hasattr(obj, '__slots__'):  # can have __slots__ with __dict__
-            size += sum(inner(getattr(obj, s)) for s in obj.__slots__ if hasattr(obj, s))
-
-        return size
-
-    return inner(obj_0)
-
-
 def get_pilot_state(job: Any = None) -> str:
     """
     Return the current pilot (job) state.
@@ -362,8 +323,8 @@ def check_for_final_server_update(update_server: bool) -> None:
     Check for the final server update.
 
     Do not set graceful stop if pilot has not finished sending the final job update
-    i.e. wait until SERVER_UPDATE is DONE_FINAL. This function sleeps for a maximum
-    of 20*30 s until SERVER_UPDATE env variable has been set to SERVER_UPDATE_FINAL.
+    i.e. wait until SERVER_UPDATE is DONE_FINAL. This function waits for a maximum
+    of 20*30 s until SERVER_UPDATE env variable has been set to SERVER_UPDATE_FINAL (by set_server_update()).
 
     :param update_server: args.update_server (bool).
     """
@@ -381,10 +342,23 @@ def check_for_final_server_update(update_server: bool) -> None:
             logger.info('server update done, finishing')
             break
         logger.info(f'server update not finished (#{counter + 1}/#{max_i})')
-        sleep(30)
+        server_update_done.wait(30)  # returns as soon as set_server_update() has set a final state
         counter += 1
 
 
+def set_server_update(state: str) -> None:
+    """
+    Set the SERVER_UPDATE env variable and wake up any thread waiting in check_for_final_server_update().
+
+    :param state: server update state, e.g. SERVER_UPDATE_FINAL (str).
+    """
+    os.environ['SERVER_UPDATE'] = state
+    if state in (SERVER_UPDATE_FINAL, SERVER_UPDATE_TROUBLE):
+        server_update_done.set()
+    else:
+        server_update_done.clear()
+
+
 def get_resource_name() -> str:
     """
     Return the name of the resource (only set for HPC resources; e.g. Cori, otherwise return 'grid').
@@ -399,33 +373,45 @@ def get_resource_name() -> str:
 
 def get_object_size(obj: Any, seen: Any = None) -> int:
     """
-    Recursively find the size of any objects.
+    Find the size of any object, including the objects it refers to.
+
+    The members are visited with an explicit work list rather than recursively, so deeply nested objects do not
+    run into the recursion limit.
 
     :param obj: object (Any)
     :param seen: logical seen variable (Any)
     :return: object size (int).
     """
-    size = sys.getsizeof(obj)
     if seen is None:
         seen = set()
-    obj_id = id(obj)
-    if obj_id in seen:
-        return 0
-
-    # Important mark as seen *before* entering recursion to gracefully handle
-    # self-referential objects
-    seen.add(obj_id)
-    if isinstance(obj, dict):
-        size += sum([get_object_size(v, seen) for v in obj.values()])
-        size += sum([get_object_size(k, seen) for k in obj.keys()])
-    elif hasattr(obj, '__dict__'):
-        size += get_object_size(obj.__dict__, seen)
-    elif hasattr(obj, '__iter__') and not isinstance(obj, (str, bytes, bytearray)):
-        size += sum([get_object_size(i, seen) for i in obj])
+
+    size = 0
+    objects = deque([obj])
+    while objects:
+        obj = objects.pop()
+        obj_id = id(obj)
+        if obj_id in seen:
+            continue
+
+        # mark as seen before visiting the members to gracefully handle self-referential objects
+        seen.add(obj_id)
+        size += sys.getsizeof(obj)
+        if type(obj) in scalar_types:
+            continue  # nothing to visit
+        if isinstance(obj, dict):
+            objects.extend(obj.values())
+            objects.extend(obj.keys())
+        elif hasattr(obj, '__dict__'):
+            objects.append(obj.__dict__)
+        elif hasattr(obj, '__iter__') and not isinstance(obj, (str, bytes, bytearray)):
+            objects.extend(obj)
 
     return size
 
 
+get_size = get_object_size  # kept for backward compatibility
+
+
 def show_memory_usage() -> None:
     """Display the current memory usage by the pilot process."""
     _, _stdout, _ = get_memory_usage(os.getpid())
@@ -435,35 +421,41 @@ def show_memory_usage() -> None:
 
 def get_memory_usage(pid: int) -> (int, str, str):
     """
-    Return the memory usage string (ps auxf <pid>) for the given process.
+    Return the memory usage string (VmRSS line in /proc/<pid>/status) for the given process.
 
     :param pid: process id (int).
-    :return: ps exit code (int), stderr (strint), stdout (string).
+    :return: exit code (int), stdout (string), stderr (string).
     """
-    return execute(f'ps aux -q {pid}', timeout=60)
+    try:
+        with open(f'/proc/{pid}/status', 'r', encoding='utf-8') as _fd:
+            for line in _fd:
+                if line.startswith('VmRSS:'):
+                    return 0, line.strip(), ''
+    except OSError as exc:
+        return 1, '', str(exc)
+
+    return 1, '', 'VmRSS not found'
 
 
 def extract_memory_usage_value(output: str) -> int:
     """
-    Extract the memory usage value from the ps output (in kB).
+    Extract the memory usage value from the /proc/<pid>/status VmRSS line (in kB).
 
-    # USER       PID %CPU %MEM    VSZ   RSS TTY      STAT START   TIME COMMAND
-    # usatlas1 13917  1.5  0.0 1324968 152832 ?      Sl   09:33   2:55 /bin/python2 ..
+    # VmRSS:    152832 kB
     # -> 152832 (kB)
 
-    :param output: ps output (str)
-    :return: memory value in kB (str).
+    :param output: VmRSS line (str)
+    :return: memory value in kB, 0 if not found (int).
     """
-    memory_usage = "(unknown)"
     for row in output.split('\n'):
-        try:
-            memory_usage = " ".join(row.split()).split(' ')[5]
-        except (IndexError, ValueError):
-            memory_usage = "(unknown)"
-        else:
-            break
+        columns = row.split()
+        if len(columns) > 1 and columns[0] == 'VmRSS:':
+            try:
+                return int(columns[1])
+            except ValueError:
+                continue
 
-    return memory_usage
+    return 0
 
 
 def cut_output(txt: str, cutat: int = 1024, separator: str = '\n[...]\n') -> str:
@@ -476,54 +468,60 @@ def cut_output(txt: str, cutat: int = 1024, separator: str = '\n[...]\n') -> str
     :return: cut text (str).
     """
     if len(txt) > 2 * cutat:
-        txt = txt[:cutat] + separator + txt[-cutat:]
+        txt = ''.join((txt[:cutat], separator, txt[-cutat:]))  # single allocation for the result
 
     return txt
 
 
+@lru_cache(maxsize=1)
+def _read_cpuinfo() -> (str, frozenset):
+    """
+    Read /proc/cpuinfo and extract the CPU flags.
+
+    The file is only read once per process since the content does not change.
+
+    :return: content of /proc/cpuinfo (str), CPU flags (frozenset).
+    """
+    try:
+        with open("/proc/cpuinfo", "r", encoding='utf-8') as _fd:
+            text = _fd.read()
+    except OSError as exc:
+        logger.warning(f'failed to read /proc/cpuinfo: {exc}')
+        return "", frozenset()
+
+    flags = set()
+    for line in text.splitlines():
+        if line.startswith(('flags', 'Features')):
+            flags.update(line.split(':', 1)[-1].split())
+
+    return text, frozenset(flags)
+
+
 def has_instruction_set(instruction_set: str) -> bool:
     """
     Determine whether a given CPU instruction set is available.
 
-    The function will use grep to search in /proc/cpuinfo (both in upper and lower case).
+    The function will look for the instruction set among the CPU flags in /proc/cpuinfo (both in upper and lower case).
 
     :param instruction_set: instruction set (e.g. AVX2) (str)
     :return: True if given instruction set is available, False otherwise (bool).
     """
-    status = False
-    cmd = fr"grep -o \'{instruction_set.lower()}[^ ]*\|{instruction_set.upper()}[^ ]*\' /proc/cpuinfo"
-    exit_code, stdout, stderr = execute(cmd)
-    if not exit_code and not stderr:
-        if instruction_set.lower() in stdout.split() or instruction_set.upper() in stdout.split():
-            status = True
-
-    return status
+    flags = _read_cpuinfo()[1]
+    return instruction_set.lower() in flags or instruction_set.upper() in flags
 
 
-def has_instruction_sets(instruction_sets: str) -> bool:
+def has_instruction_sets(instruction_sets: list) -> str:
     """
     Determine whether a given list of CPU instruction sets is available.
 
-    The function will use grep to search in /proc/cpuinfo (both in upper and lower case).
+    The function will look for the instruction sets among the CPU flags in /proc/cpuinfo (both in upper and lower case).
     Example: instruction_sets = ['AVX', 'AVX2', 'SSE4_2', 'XXX'] -> "AVX|AVX2|SSE4_2"
 
-    :param instruction_sets: instruction set (e.g. AVX2) (str)
-    :return: True if given instruction set is available, False otherwise (bool).
+    :param instruction_sets: instruction sets (e.g. ['AVX2']) (list)
+    :return: '|'-separated string of the available instruction sets (str).
     """
-    ret = ""
-    pattern = ""
-
-    for instr in instruction_sets:
-        pattern += fr'\|{instr.lower()}[^ ]*\|{instr.upper()}[^ ]*' if pattern else fr'{instr.lower()}[^ ]*\|{instr.upper()}[^ ]*'
-    cmd = f"grep -o \'{pattern}\' /proc/cpuinfo"
-
-    exit_code, stdout, stderr = execute(cmd)
-    if not exit_code and not stderr:
-        for instr in instruction_sets:
-            if instr.lower() in stdout.split() or instr.upper() in stdout.split():
-                ret += f'|{instr.upper()}' if ret else instr.upper()
-
-    return ret
+    flags = _read_cpuinfo()[1]
+    return '|'.join(instr.upper() for instr in instruction_sets if instr.lower() in flags or instr.upper() in flags)
 
 
 def locate_core_file(cmd: str = '', pid: int = 0) -> str:
@@ -551,7 +549,7 @@ def locate_core_file(cmd: str = '', pid: int = 0) -> str:
     return path
 
 
-def get_pid_from_command(cmd: str, pattern: str = r'gdb --pid (\d+)') -> int:
+def get_pid_from_command(cmd: str, pattern: Any = GDB_PID_PATTERN) -> int:
     r"""
     Identify an explicit process id in the given command.
 
@@ -560,7 +558,7 @@ def get_pid_from_command(cmd: str, pattern: str = r'gdb --pid (\d+)') -> int:
         -> pid = 19114
 
     :param cmd: command containing a pid (str)
-    :param pattern: regex pattern (raw str)
+    :param pattern: regex pattern (raw str or compiled pattern)
     :return: pid (int).
     """
     pid = None
@@ -571,7 +569,7 @@ def get_pid_from_command(cmd: str, pattern: str = r'gdb --pid (\d+)') -> int:
         except (IndexError, ValueError):
             pid = None
     else:
-        logger.warning(f"no match for pattern \'{pattern}\' in command=\'{cmd}\'")
+        logger.warning(f"no match for pattern \'{getattr(pattern, 'pattern', pattern)}\' in command=\'{cmd}\'")
 
     return pid
 
@@ -603,18 +601,14 @@ def get_display_info() -> (str, str):
     product = ''
     stdout = list_hardware()
     if stdout:
-        vendor_pattern = re.compile(r'vendor\:\ (.+)\ .')
-        product_pattern = re.compile(r'product\:\ (.+)\ .')
-
         for line in stdout.split('\n'):
-            if 'vendor' in line:
-                result = re.findall(vendor_pattern, line)
-                if result:
-                    vendor = result[0]
-            elif 'product' in line:
-                result = re.findall(product_pattern, line)
-                if result:
-                    product = result[0]
+            match = VENDOR_PRODUCT_PATTERN.search(line)
+            if not match:
+                continue
+            if match.group(1) == 'vendor':
+                vendor = match.group(2)
+            else:
+                product = match.group(2)
 
     return product, vendor
 
@@ -628,9 +622,13 @@ def get_key_value(catchall: str, key: str = 'SOMEKEY') -> str:
     :return: value (str).
     """
     # ignore any non-key-value pairs that might be present in the catchall string
-    _dic = dict(_str.split('=', 1) for _str in catchall.split() if '=' in _str)
+    # (scan from the end since the last occurrence of a key takes precedence)
+    prefix = f'{key}='
+    for _str in reversed(catchall.split()):
+        if _str.startswith(prefix):
+            return _str[len(prefix):]
 
-    return _dic.get(key)
+    return None
 
 
 def is_string(obj: Any) -> bool:
@@ -648,12 +646,13 @@ def find_pattern_in_list(input_list: list, pattern: str) -> str:
     Search for the given pattern in the input list.
 
     :param input_list: list of strings (list)
-    :param pattern: regular expression pattern (raw str)
+    :param pattern: regular expression pattern (raw str or compiled pattern)
     :return: found string (str or None).
     """
     found = None
+    search = re.compile(pattern).search
     for line in input_list:
-        out = re.search(pattern, line)
+        out = search(line)
         if out:
             found = out[0]
             break
@@ -670,15 +669,12 @@ def sort_words(input_str: str) -> str:
     :param input_str: input string (str)
     :return: sorted output string (str).
     """
-    output_str = input_str
     try:
-        tmp = output_str.split()
-        tmp.sort()
-        output_str = ' '.join(tmp)
+        return ' '.join(sorted(input_str.split()))
     except (AttributeError, TypeError) as exc:
         logger.warning(f'failed to sort input string: {input_str}, exc={exc}')
 
-    return output_str
+    return input_str
 
 
 def encode_globaljobid(jobid: str, maxsize: int = 31) -> str:
@@ -21,7 +21,6 @@
 
 """Functions for executing commands."""
 
-import os
 import subprocess
 import logging
 import re
@@ -81,8 +80,6 @@ def execute(executable: Any, **kwargs: dict) -> Any:
     # always use a timeout to prevent stdout buffer problem in nodes with lots of cores
     timeout = get_timeout(kwargs.get('timeout', None))
 
-    exe = ['/usr/bin/python'] + executable.split() if kwargs.get('mode', 'bash') == 'python' else ['/bin/bash', '-c', executable]
-
     # try: intercept exception such as OSError -> report e.g. error.RESOURCEUNAVAILABLE: "Resource temporarily unavailable"
     exit_code = 0
     stdout = ''
@@ -91,14 +88,7 @@ def execute(executable: Any, **kwargs: dict) -> Any:
     # Acquire the lock before creating the subprocess
     process = None
     with execute_lock:
-        process = subprocess.Popen(exe,
-                                   bufsize=-1,
-                                   stdout=kwargs.get('stdout', subprocess.PIPE),
-                                   stderr=kwargs.get('stderr', subprocess.PIPE),
-                                   cwd=kwargs.get('cwd', getcwd()),
-                                   preexec_fn=os.setsid,    # setpgrp
-                                   encoding='utf-8',
-                                   errors='replace')
+        process = start_process(executable, **kwargs)
         if kwargs.get('returnproc', False):
             return process
 
@@ -163,19 +153,11 @@ def execute2(executable: Any, stdout_file: TextIO, stderr_file: TextIO, timeout_
     if not kwargs.get('mute', False):
         print_executable(executable, obscure=obscure)
 
-    exe = ['/usr/bin/python'] + executable.split() if kwargs.get('mode', 'bash') == 'python' else ['/bin/bash', '-c', executable]
-
     # Create the subprocess with stdout and stderr redirection to files
     # Acquire the lock before creating the subprocess
     process = None
     with execute_lock:
-        process = subprocess.Popen(exe,
-                                   stdout=stdout_file,
-                                   stderr=stderr_file,
-                                   cwd=kwargs.get('cwd', os.getcwd()),
-                                   preexec_fn=os.setsid,
-                                   encoding='utf-8',
-                                   errors='replace')
+        process = start_process(executable, **dict(kwargs, stdout=stdout_file, stderr=stderr_file))
 
         # Set up a timer for the timeout
         timeout_timer = threading.Timer(timeout_seconds, _timeout_handler)
@@ -213,6 +195,31 @@ def execute2(executable: Any, stdout_file: TextIO, stderr_file: TextIO, timeout_
     return exit_code
 
 
+def start_process(executable: str, **kwargs: dict) -> Any:
+    """
+    Start the given command in a new session and return the process object.
+
+    This is the common subprocess setup used by execute() and execute2(). The command is run with bash, or with
+    python if mode='python' is set in kwargs. The stdout, stderr, cwd and env kwargs are passed on to Popen (the
+    default is to use pipes for stdout and stderr, the current directory and to inherit the environment of the pilot).
+
+    :param executable: command to be executed (str)
+    :param kwargs: kwargs (dict)
+    :return: process object (Any).
+    """
+    exe = ['/usr/bin/python'] + executable.split() if kwargs.get('mode', 'bash') == 'python' else ['/bin/bash', '-c', executable]
+
+    return subprocess.Popen(exe,
+                            bufsize=-1,
+                            stdout=kwargs.get('stdout', subprocess.PIPE),
+                            stderr=kwargs.get('stderr', subprocess.PIPE),
+                            cwd=kwargs.get('cwd', getcwd()),
+                            env=kwargs.get('env'),  # None means inherit the environment of the pilot
+                            start_new_session=True,  # setsid() without a preexec_fn (allows vfork/posix_spawn)
+                            encoding='utf-8',
+                            errors='replace')
+
+
 def get_timeout(requested_timeout: int) -> int:
     """
     Define the timeout to be used with subprocess.communicate().
@@ -238,8 +245,8 @@ def execute_command(command: str) -> str:
         logger.info(f'executing command: {command}')
         command = shlex.split(command)
         proc = subprocess.Popen(command, shell=False, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-        proc.wait()
-        #output, err = proc.communicate()
+        # drain the pipes while waiting, otherwise the child blocks once it has filled the pipe buffer
+        proc.communicate()
         exit_code = proc.returncode
         logger.info(f'command finished with exit code: {exit_code}')
         # output = subprocess.check_output(command, text=True)
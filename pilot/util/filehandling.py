@@ -577,13 +577,16 @@ def copy(path1: str, path2: str):
     :param path2: file path (str)
     :raises PilotException: FileHandlingFailure, NoSuchFile.
     """
-    if not os.path.exists(path1):
+    # let copy2() detect a missing source file instead of stat'ing it first
+    try:
+        copy2(path1, path2)
+    except FileNotFoundError as exc:
+        if exc.filename != os.fspath(path1):
+            logger.warning(f"exception caught during file copy: {exc}")
+            raise FileHandlingFailure(exc)
         diagnostics = f'file copy failure: path does not exist: {path1}'
         logger.warning(diagnostics)
         raise NoSuchFile(diagnostics)
-
-    try:
-        copy2(path1, path2)
     except IOError as exc:
         logger.warning(f"exception caught during file copy: {exc}")
         raise FileHandlingFailure(exc)
@@ -23,6 +23,7 @@ import os
 import time
 import signal
 import re
+import selectors
 import threading
 
 from pilot.util.container import execute
@@ -599,6 +600,57 @@ def is_process_running(process_id):
         return False
 
 
+def wait_for_process(process, timeout, stop_event=None, interval=1):
+    """
+    Wait at most the given time for a subprocess to finish.
+
+    On Linux a pidfd is registered with a selector so that the call returns as soon as the child exits, instead of
+    at the next poll tick. If os.pidfd_open() is not available (or fails), fall back to sleep + process.poll().
+    If a stop event is given, it is checked every interval seconds and the wait ends once it has been set. The pidfd
+    and the selector are opened once per call and reused for every interval.
+
+    :param process: subprocess.Popen object (Any)
+    :param timeout: maximum time to wait in seconds (float)
+    :param stop_event: optional event that ends the wait when set (threading.Event)
+    :param interval: time between the stop event checks in seconds (float)
+    :return: exit code, or None if the process is still running (int).
+    """
+    exit_code = process.poll()
+    if exit_code is not None:
+        return exit_code
+
+    step = interval if stop_event is not None else timeout
+    end_time = time.monotonic() + timeout
+    try:
+        pidfd = os.pidfd_open(process.pid)
+    except (AttributeError, OSError):
+        pidfd = None
+
+    selector = None
+    try:
+        if pidfd is not None:
+            selector = selectors.DefaultSelector()
+            selector.register(pidfd, selectors.EVENT_READ)
+        while True:
+            remaining = end_time - time.monotonic()
+            if remaining <= 0 or (stop_event is not None and stop_event.is_set()):
+                break
+            if selector:
+                selector.select(min(step, remaining))
+            else:
+                time.sleep(min(step, remaining))
+            exit_code = process.poll()
+            if exit_code is not None:
+                return exit_code
+    finally:
+        if selector:
+            selector.close()
+        if pidfd is not None:
+            os.close(pidfd)
+
+    return process.poll()
+
+
 def cleanup(job, args):
     """
     Cleanup called after completion of job.
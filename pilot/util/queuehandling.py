@@ -24,7 +24,7 @@ import time
 
 from pilot.common.errorcodes import ErrorCodes
 from pilot.info import JobData
-from pilot.util.auxiliary import set_pilot_state, is_string
+from pilot.util.auxiliary import set_pilot_state
 
 import logging
 logger = logging.getLogger(__name__)
@@ -157,7 +157,7 @@ def abort_jobs_in_queues(queues, sig):
         _queue = getattr(queues, queue)
         jobs = list(_queue.queue)
         for job in jobs:
-            if is_string(job):  # this will be the case for the completed_jobids queue
+            if isinstance(job, str):  # this will be the case for the completed_jobids queue
                 continue
             if job not in jobs_list:
                 jobs_list.append(job)